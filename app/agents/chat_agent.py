@@ -10,23 +10,57 @@
 # - Memory management and conversation history
 #-------------------------------------------------------------------------------------#
 import os
-from typing import Dict, Any, List
+import threading
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional, Union
 from crewai import Agent, Task, Crew
 from dotenv import load_dotenv
 import groq
 
+from app.config.loader import AgentConfig
+from app.models.message import Conversation
+from app.utils.background_jobs import BackgroundJobs, get_background_jobs
+from app.utils.event_log import get_event_log
+from app.utils.llm_router import ModelRouter, get_model_router
+
 # Load environment variables
 load_dotenv()
 
+# Number of recent turns sent to the model with each message
+HISTORY_TURNS = 10
+
+_groq_client: Optional[groq.Groq] = None
+_groq_client_lock = threading.Lock()
+
+def get_groq_client() -> groq.Groq:
+    """Return the process-wide Groq client, sharing its HTTP connection pool"""
+    global _groq_client
+    with _groq_client_lock:
+        if _groq_client is None:
+            _groq_client = groq.Groq(api_key=os.getenv("GROQ_API_KEY"))
+        return _groq_client
+
 class ChatAgent:
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None,
+                 background_jobs: Optional[BackgroundJobs] = None,
+                 config: Optional[AgentConfig] = None):
         """Initialize the chat agent with Groq LLM"""
-        self.groq_client = groq.Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.groq_client = get_groq_client()
         self.model = os.getenv("GROQ_MODEL", "llama3-groq-70b-8192-tool-use-preview")
-        self.conversation_history = []
+        # Chat turns are routed between small and large models with failover
+        self.router = router or get_model_router(self.groq_client)
+        # One compact, memory-capped record of the session, shared with the frontend
+        self.conversation_history = Conversation()
         
-        # Initialize CrewAI agents
-        self.chat_agent = Agent(
+        # Crew runs happen in the background and are delivered as follow-ups
+        self.background_jobs = background_jobs or get_background_jobs()
+        # Only jobs started for this agent's own conversation are tracked here
+        self._crew_jobs: List[str] = []
+        self._crew_jobs_lock = threading.Lock()
+        self.event_log = get_event_log()
+        
+        # Initialize CrewAI agents; agents.yaml settings override the lead agent's defaults
+        chat_settings = dict(
             role='Lead Conversational Assistant',
             goal='Engage in natural, helpful conversation and coordinate with other agents',
             backstory="""You are an expert conversational AI assistant with deep knowledge 
@@ -36,6 +70,9 @@ class ChatAgent:
             verbose=True,
             llm=self.create_groq_llm()
         )
+        if config:
+            chat_settings.update(config.agent_kwargs())
+        self.chat_agent = Agent(**chat_settings)
         
         self.scheduling_agent = Agent(
             role='Scheduling Assistant',
@@ -73,57 +110,183 @@ class ChatAgent:
             "client": self.groq_client
         }
 
-    def process_message(self, message: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Process a user message and return a response"""
+    def _history_for(self, context: Optional[Dict[str, Any]]
+                     ) -> Union[Conversation, List[Dict[str, str]]]:
+        """
+        Return the conversation a turn should use.
+
+        Callers that keep conversation state themselves (e.g. the HTTP API, where
+        one agent serves many clients) pass it as ``context["history"]``; only
+        its recent turns are used, as a plain list, so the shared agent's own
+        history is never touched and no Conversation is built per request.
+        """
+        if context and context.get("history") is not None:
+            return list(context["history"][-HISTORY_TURNS:])
+        return self.conversation_history
+
+    def _build_messages(self, history: Union[Conversation, List[Dict[str, str]]]
+                        ) -> List[Dict[str, str]]:
+        """Build the completion request messages from the conversation history"""
+        recent = (history.recent(HISTORY_TURNS) if isinstance(history, Conversation)
+                  else history[-HISTORY_TURNS:])
+        return [{"role": "system", "content": self.chat_agent.backstory}, *recent]
+
+    def stream_message(self, message: str, context: Dict[str, Any] = None) -> Iterator[str]:
+        """Stream the chat answer for a user message as text chunks"""
+        history = self._history_for(context)
+        history.append({"role": "user", "content": message})
+        parts = []
+        first_chunk_ms = None
+        started = time.perf_counter()
+        try:
+            for delta in self.router.stream(self._build_messages(history),
+                                            temperature=0.7, max_tokens=4096):
+                if not parts:
+                    first_chunk_ms = (time.perf_counter() - started) * 1000
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            self.event_log.log("chat_stream", success=False, error=str(e),
+                               latency_ms=(time.perf_counter() - started) * 1000)
+            raise
+        history.append({"role": "assistant", "content": "".join(parts)})
+        self.event_log.log("chat_stream", success=True, chunks=len(parts),
+                           first_chunk_ms=first_chunk_ms,
+                           latency_ms=(time.perf_counter() - started) * 1000)
+
+    def start_crew_tasks(self, message: str,
+                         on_crew_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                         track: bool = True) -> Optional[str]:
+        """
+        Start crew work for a message in the background.
+
+        ``track`` records the job so ``cancel_crew_jobs`` can cancel it; agents
+        shared between clients pass False and leave cancellation to the client.
+
+        Returns:
+            Optional[str]: Job id to poll with ``get_crew_result``, or None if the
+                message does not need the crew
+        """
+        tasks = []
+        if self._requires_scheduling(message):
+            tasks.append(Task(
+                description=f"Schedule task: {message}",
+                expected_output="A short summary of the scheduling outcome",
+                agent=self.scheduling_agent
+            ))
+        
+        if self._requires_content_creation(message):
+            tasks.append(Task(
+                description=f"Create content: {message}",
+                expected_output="The requested content",
+                agent=self.content_agent
+            ))
+        
+        if not tasks:
+            return None
+        
+        agents = [task.agent.role for task in tasks]
+
+        def run_crew(cancelled: threading.Event) -> str:
+            # Tasks run one at a time in their own Crew so a cancelled job stops at
+            # the next task boundary instead of occupying a worker until the end
+            started = time.perf_counter()
+            outputs = []
+            try:
+                for task in tasks:
+                    if cancelled.is_set():
+                        self.event_log.log("crew", agents=agents, success=False,
+                                           error="cancelled", completed=len(outputs),
+                                           latency_ms=(time.perf_counter() - started) * 1000)
+                        return "\n\n".join(outputs)
+                    crew = Crew(agents=self.crew.agents, tasks=[task], verbose=True)
+                    outputs.append(str(crew.kickoff()))
+            except Exception as e:
+                self.event_log.log("crew", agents=agents, success=False, error=str(e),
+                                   latency_ms=(time.perf_counter() - started) * 1000)
+                raise
+            self.event_log.log("crew", agents=agents, success=True,
+                               latency_ms=(time.perf_counter() - started) * 1000)
+            return "\n\n".join(outputs)
+
+        job_id = self.background_jobs.submit(run_crew, on_crew_result, with_cancel_event=True)
+        if track:
+            with self._crew_jobs_lock:
+                self._crew_jobs.append(job_id)
+        return job_id
+
+    def get_crew_result(self, job_id: str) -> Dict[str, Any]:
+        """Poll a crew job; finished jobs are returned once and then forgotten"""
+        status = self.background_jobs.pop(job_id)
+        if status["status"] not in ("pending", "running"):
+            with self._crew_jobs_lock:
+                if job_id in self._crew_jobs:
+                    self._crew_jobs.remove(job_id)
+        return status
+
+    def cancel_crew_jobs(self) -> int:
+        """Cancel this agent's unfinished crew jobs, e.g. when the user moves on"""
+        with self._crew_jobs_lock:
+            job_ids, self._crew_jobs = self._crew_jobs, []
+        return sum(1 for job_id in job_ids if self.background_jobs.cancel(job_id))
+
+    def process_message(self, message: str, context: Dict[str, Any] = None,
+                        on_crew_result: Optional[Callable[[str, Dict[str, Any]], None]] = None
+                        ) -> Dict[str, Any]:
+        """
+        Process a user message and return a response.
+
+        Crew work is started in the background before the main completion and
+        never delays it; the returned ``crew_job_id`` can be polled with
+        ``get_crew_result`` or the result delivered through ``on_crew_result``.
+        """
+        crew_job_id = None
+        started = time.perf_counter()
         try:
             # Add message to conversation history
-            self.conversation_history.append({"role": "user", "content": message})
+            history = self._history_for(context)
+            history.append({"role": "user", "content": message})
             
-            # Prepare the conversation context
-            system_prompt = self.chat_agent.backstory
+            # A new message from a session-owned agent supersedes earlier crew work;
+            # agents shared between clients (history passed in) leave other jobs alone
+            owns_history = history is self.conversation_history
+            if owns_history:
+                self.cancel_crew_jobs()
+            crew_job_id = self.start_crew_tasks(message, on_crew_result, track=owns_history)
             
             # Create the chat completion with conversation history
-            completion = self.groq_client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    *self.conversation_history[-10:]  # Include last 10 messages for context
-                ],
-                model=self.model,
+            completion = self.router.complete(
+                self._build_messages(history),
                 temperature=0.7,
                 max_tokens=4096
             )
             
-            response = completion.choices[0].message.content
+            response = completion.text
             
             # Add response to conversation history
-            self.conversation_history.append({"role": "assistant", "content": response})
+            history.append({"role": "assistant", "content": response})
             
-            # Create and process any necessary tasks based on the message
-            if self._requires_scheduling(message):
-                task = Task(
-                    description=f"Schedule task: {message}",
-                    agent=self.scheduling_agent
-                )
-                self.crew.tasks.append(task)
-            
-            if self._requires_content_creation(message):
-                task = Task(
-                    description=f"Create content: {message}",
-                    agent=self.content_agent
-                )
-                self.crew.tasks.append(task)
-            
-            # Process any pending tasks
-            if self.crew.tasks:
-                crew_result = self.crew.kickoff()
-                response += f"\n\nAdditional insights from the crew:\n{crew_result}"
+            self.event_log.log(
+                "chat", success=True, model=completion.model,
+                attempts=completion.attempts,
+                prompt_tokens=completion.prompt_tokens,
+                completion_tokens=completion.completion_tokens,
+                crew_job_id=crew_job_id,
+                latency_ms=(time.perf_counter() - started) * 1000
+            )
             
             return {
                 "response": response,
+                "model": completion.model,
+                "crew_job_id": crew_job_id,
                 "success": True
             }
             
         except Exception as e:
+            if crew_job_id:
+                self.background_jobs.cancel(crew_job_id)
+            self.event_log.log("chat", success=False, error=str(e),
+                               latency_ms=(time.perf_counter() - started) * 1000)
             return {
                 "response": f"I apologize, but I encountered an error: {str(e)}",
                 "success": False,
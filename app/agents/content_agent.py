@@ -9,11 +9,15 @@
 # - SEO optimization and keyword analysis
 # - Multi-format content adaptation
 #-------------------------------------------------------------------------------------#
+from typing import Optional
+
 from crewai import Agent
 
+from app.config.loader import AgentConfig
+
 class ContentAgent:
-    def __init__(self):
-        self.agent = Agent(
+    def __init__(self, config: Optional[AgentConfig] = None):
+        settings = dict(
             role='Content Creation Specialist',
             goal='Generate and optimize content for various platforms',
             backstory="""You are a creative content specialist with expertise in 
@@ -21,6 +25,9 @@ class ContentAgent:
             audience engagement, SEO, and platform-specific best practices.""",
             verbose=True
         )
+        if config:
+            settings.update(config.agent_kwargs())
+        self.agent = Agent(**settings)
 
     def generate_social_content(self, topic, platform, target_audience):
         """Generate platform-specific social media content"""
@@ -10,11 +10,15 @@
 # - Episode planning and series management
 # - Audio content recommendations
 #-------------------------------------------------------------------------------------#
+from typing import Optional
+
 from crewai import Agent
 
+from app.config.loader import AgentConfig
+
 class PodcastAgent:
-    def __init__(self):
-        self.agent = Agent(
+    def __init__(self, config: Optional[AgentConfig] = None):
+        settings = dict(
             role='Podcast Co-Host and Producer',
             goal='Co-host and produce engaging podcast content',
             backstory="""You are an AI podcast co-host with expertise in engaging 
@@ -23,6 +27,9 @@ class PodcastAgent:
             podcast content.""",
             verbose=True
         )
+        if config:
+            settings.update(config.agent_kwargs())
+        self.agent = Agent(**settings)
 
     def generate_episode_outline(self, topic, duration):
         """Generate a structured outline for a podcast episode"""
@@ -8,12 +8,31 @@
 # - Scheduling optimization and conflict resolution
 # - Time zone handling and availability checks
 # - Integration with calendar services
+#
+# Availability and conflict arithmetic is done by the local calendar engine in
+# app/utils/calendar_utils.py; the LLM is only consulted to pick between
+# pre-computed candidate slots when free-text preferences are given.
 #-------------------------------------------------------------------------------------#
-from crewai import Agent
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from crewai import Agent, Crew, Task
+
+from app.config.loader import AgentConfig
+from app.utils.calendar_utils import (
+    CalendarStore,
+    from_timestamp,
+    group_overlapping,
+    to_timestamp,
+    working_hours,
+)
 
 class SchedulingAgent:
-    def __init__(self):
-        self.agent = Agent(
+    def __init__(self, calendar: Optional[CalendarStore] = None,
+                 config: Optional[AgentConfig] = None):
+        self.calendar = calendar or CalendarStore()
+        settings = dict(
             role='Scheduling Assistant',
             goal='Manage and optimize calendar scheduling and time management tasks',
             backstory="""You are an expert scheduling assistant with deep knowledge of 
@@ -21,15 +40,165 @@ class SchedulingAgent:
             effectively and coordinate meetings and events efficiently.""",
             verbose=True
         )
+        if config:
+            settings.update(config.agent_kwargs())
+        self.agent = Agent(**settings)
+
+    def schedule_meeting(self, participants: List[str], duration: timedelta,
+                         preferences: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Schedule a meeting based on participants' availability and preferences.
+
+        Args:
+            participants (List[str]): Calendar owners who must attend
+            duration (timedelta): Meeting length
+            preferences (Optional[Dict[str, Any]]): Supported keys are
+                ``window_start``/``window_end`` (search range, default next 7 days),
+                ``working_hours`` (``(start_hour, end_hour)`` or ``None`` to disable),
+                ``step_minutes`` (slot alignment, default 30), ``title``,
+                ``max_candidates`` (default 5), ``book`` (default True) and
+                ``notes`` (free text passed to the LLM to choose a candidate)
+
+        Returns:
+            Dict[str, Any]: ``success``, the chosen ``slot`` and the ``candidates`` considered
+        """
+        preferences = preferences or {}
+        now = datetime.now(timezone.utc)
+        window_start = to_timestamp(preferences.get("window_start", now))
+        window_end = to_timestamp(preferences.get("window_end", now + timedelta(days=7)))
+        step = timedelta(minutes=preferences.get("step_minutes", 30))
+
+        extra_busy = []
+        hours = preferences.get("working_hours", (9, 17))
+        if hours:
+            extra_busy = working_hours(window_start, window_end, hours[0], hours[1])
+
+        slots = self.calendar.find_common_slots(
+            participants, duration, window_start, window_end, step=step, extra_busy=extra_busy
+        )
+        candidates = slots[:preferences.get("max_candidates", 5)]
+        if not candidates:
+            return {"success": False, "slot": None, "candidates": [],
+                    "error": "No common free slot found in the requested window"}
+
+        choice = 0
+        if preferences.get("notes") and len(candidates) > 1:
+            choice = self._choose_candidate(candidates, preferences["notes"])
+        start, end = candidates[choice]
+
+        if preferences.get("book", True):
+            title = preferences.get("title", "Meeting")
+            for participant in participants:
+                self.calendar.add_event(participant, title, start, end,
+                                        metadata={"participants": list(participants)})
 
-    def schedule_meeting(self, participants, duration, preferences):
-        """Schedule a meeting based on participants' availability and preferences"""
-        pass
+        return {
+            "success": True,
+            "slot": (from_timestamp(start), from_timestamp(end)),
+            "candidates": [(from_timestamp(s), from_timestamp(e)) for s, e in candidates],
+        }
 
-    def optimize_calendar(self, calendar_data):
-        """Optimize calendar layout and suggest improvements"""
-        pass
+    def optimize_calendar(self, calendar_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Optimize calendar layout and suggest improvements.
 
-    def handle_conflicts(self, conflicting_events):
-        """Resolve scheduling conflicts and suggest alternatives"""
-        pass
+        ``calendar_data`` holds the ``owner`` and optional ``start``/``end`` range.
+        Reports conflicts, fragmented free time and the longest focus block.
+        """
+        owner = calendar_data["owner"]
+        start = to_timestamp(calendar_data.get("start", datetime.now(timezone.utc)))
+        end = to_timestamp(calendar_data.get("end", start + timedelta(days=7).total_seconds()))
+        min_focus = timedelta(minutes=calendar_data.get("min_focus_minutes", 90)).total_seconds()
+
+        hours = calendar_data.get("working_hours", (9, 17))
+        extra_busy = working_hours(start, end, hours[0], hours[1]) if hours else []
+        busy = self.calendar.busy_intervals(owner, start, end)
+        gaps = self.calendar.find_common_slots([owner], timedelta(0), start, end, extra_busy=extra_busy)
+        gaps = [(s, e) for s, e in gaps if e > s]
+
+        focus_blocks = [(s, e) for s, e in gaps if e - s >= min_focus]
+        fragments = [(s, e) for s, e in gaps if e - s < min_focus]
+        suggestions = []
+        if fragments:
+            suggestions.append(
+                f"{len(fragments)} free gaps are shorter than {int(min_focus // 60)} minutes; "
+                "consider batching adjacent meetings"
+            )
+        conflicts = self.calendar.find_conflicts(owner, start, end)
+        if conflicts:
+            suggestions.append(f"{len(conflicts)} groups of overlapping events need resolving")
+
+        longest = max(focus_blocks, key=lambda gap: gap[1] - gap[0], default=None)
+        return {
+            "busy_hours": sum(e - s for s, e in busy) / 3600,
+            "conflicts": conflicts,
+            "focus_blocks": [(from_timestamp(s), from_timestamp(e)) for s, e in focus_blocks],
+            "fragmented_minutes": sum(e - s for s, e in fragments) / 60,
+            "longest_focus_block": (from_timestamp(longest[0]), from_timestamp(longest[1]))
+            if longest else None,
+            "suggestions": suggestions,
+        }
+
+    def handle_conflicts(self, conflicting_events: List[Any], window_days: int = 7,
+                         hours: Optional[tuple] = (9, 17)) -> List[Dict[str, Any]]:
+        """
+        Resolve scheduling conflicts and suggest alternatives.
+
+        ``conflicting_events`` is either a flat list of events or the groups
+        returned by ``CalendarStore.find_conflicts``. The earliest event of each
+        overlapping group keeps its slot; every other event gets the next free
+        slot of the same length for its owner, within ``hours`` (``None`` to
+        disable) and not clashing with alternatives already suggested.
+        """
+        suggestions = []
+        if conflicting_events and isinstance(conflicting_events[0], dict):
+            groups = group_overlapping(conflicting_events)
+        else:
+            groups = [group for events in conflicting_events for group in group_overlapping(events)]
+        if not groups:
+            return suggestions
+
+        search_from = max(event["end_ts"] for group in groups for event in group)
+        search_to = search_from + timedelta(days=window_days).total_seconds()
+        blocked = working_hours(search_from, search_to, hours[0], hours[1]) if hours else []
+        reserved: Dict[str, List[tuple]] = {}
+        for group in groups:
+            for event in group[1:]:
+                owner_reserved = reserved.setdefault(event["owner"], [])
+                slots = self.calendar.find_common_slots(
+                    [event["owner"]], timedelta(seconds=event["end_ts"] - event["start_ts"]),
+                    search_from, search_to, step=timedelta(minutes=15),
+                    extra_busy=blocked + owner_reserved
+                )
+                alternative = None
+                if slots:
+                    owner_reserved.append(slots[0])
+                    alternative = (from_timestamp(slots[0][0]), from_timestamp(slots[0][1]))
+                else:
+                    logging.info(f"No alternative slot found for event {event['uid']}")
+                suggestions.append({"uid": event["uid"], "title": event.get("title"),
+                                    "alternative": alternative})
+        return suggestions
+
+    def _choose_candidate(self, candidates: List[tuple], notes: str) -> int:
+        """Ask the LLM which pre-computed candidate best matches free-text preferences"""
+        options = "\n".join(
+            f"{i}: {from_timestamp(s).isoformat()} - {from_timestamp(e).isoformat()}"
+            for i, (s, e) in enumerate(candidates)
+        )
+        task = Task(
+            description=(
+                f"The user has these scheduling preferences: {notes}\n"
+                f"Choose the best of these available slots:\n{options}\n"
+                "Answer with the slot number only."
+            ),
+            expected_output="A single slot number",
+            agent=self.agent
+        )
+        try:
+            result = str(Crew(agents=[self.agent], tasks=[task]).kickoff()).strip()
+            choice = int("".join(ch for ch in result if ch.isdigit()) or 0)
+            return choice if 0 <= choice < len(candidates) else 0
+        except Exception as e:
+            logging.error(f"Error ranking candidate slots: {str(e)}")
+            return 0
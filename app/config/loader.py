@@ -0,0 +1,217 @@
+#-------------------------------------------------------------------------------------#
+# File: loader.py
+# Description: Typed, validated and cached loading of the agent and task YAML config
+# Author: @hams_ollo
+#
+# This module manages:
+# - Parsing agents.yaml and tasks.yaml into typed config objects
+# - Schema validation that fails fast with a clear error
+# - A per-process cache keyed on file path and modification time
+# - Change detection so long-running workers can hot-reload config
+#-------------------------------------------------------------------------------------#
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+# Resolved relative to this file so loading does not depend on the working directory
+DEFAULT_CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_FILE = "agents.yaml"
+TASKS_FILE = "tasks.yaml"
+
+
+class ConfigError(ValueError):
+    """Raised when a configuration file is missing or does not match the schema"""
+
+
+@dataclass(frozen=True)
+class AgentConfig:
+    """Configuration for a single agent entry in agents.yaml"""
+    name: str
+    role: str
+    goal: str
+    backstory: str
+    verbose: bool = True
+    tools: Tuple[str, ...] = ()
+
+    def agent_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments that override a crewai Agent's defaults"""
+        return {"role": self.role, "goal": self.goal,
+                "backstory": self.backstory, "verbose": self.verbose}
+
+
+@dataclass(frozen=True)
+class TaskConfig:
+    """Configuration for a single task entry in tasks.yaml"""
+    name: str
+    group: str
+    description: str
+    agent: str
+    tools: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Validated agent and task configuration, plus the file versions it came from"""
+    agents: Dict[str, AgentConfig]
+    tasks: Dict[str, TaskConfig]
+    version: Tuple[Tuple[int, int], ...] = field(default=(), compare=False)
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+# Only the latest parsed config per directory is kept
+_app_configs: Dict[str, AppConfig] = {}
+_cache_lock = threading.Lock()
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    """Return (mtime_ns, size) for a file, used as its cache key"""
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise ConfigError(f"Configuration file not found: {path}") from e
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_yaml(path: str) -> Any:
+    """Parse a YAML file once per process, re-reading only when it changes on disk"""
+    path = os.path.abspath(path)
+    version = _file_version(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+    try:
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f)
+    except yaml.YAMLError as e:
+        raise ConfigError(f"Invalid YAML in {path}: {e}") from e
+    with _cache_lock:
+        _cache[path] = (version, data)
+    return data
+
+
+def _require_str(entry: Dict[str, Any], key: str, where: str) -> str:
+    value = entry.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise ConfigError(f"{where}: '{key}' must be a non-empty string")
+    return value
+
+
+def _tools(entry: Dict[str, Any], where: str) -> Tuple[str, ...]:
+    tools = entry.get("tools") or []
+    if not isinstance(tools, list) or not all(isinstance(tool, str) for tool in tools):
+        raise ConfigError(f"{where}: 'tools' must be a list of strings")
+    return tuple(tools)
+
+
+def parse_agents(data: Any, source: str = AGENTS_FILE) -> Dict[str, AgentConfig]:
+    """Validate raw agents.yaml data and build AgentConfig objects"""
+    if not isinstance(data, dict) or not data:
+        raise ConfigError(f"{source}: expected a mapping of agent names to settings")
+    agents = {}
+    for name, entry in data.items():
+        where = f"{source}: agent '{name}'"
+        if not isinstance(entry, dict):
+            raise ConfigError(f"{where}: expected a mapping")
+        verbose = entry.get("verbose", True)
+        if not isinstance(verbose, bool):
+            raise ConfigError(f"{where}: 'verbose' must be true or false")
+        agents[name] = AgentConfig(
+            name=name,
+            role=_require_str(entry, "role", where),
+            goal=_require_str(entry, "goal", where),
+            backstory=_require_str(entry, "backstory", where),
+            verbose=verbose,
+            tools=_tools(entry, where),
+        )
+    return agents
+
+
+def parse_tasks(data: Any, agents: Dict[str, AgentConfig],
+                source: str = TASKS_FILE) -> Dict[str, TaskConfig]:
+    """Validate raw tasks.yaml data (groups of named tasks) and build TaskConfig objects"""
+    if not isinstance(data, dict) or not data:
+        raise ConfigError(f"{source}: expected a mapping of task groups")
+    tasks = {}
+    for group, entries in data.items():
+        if not isinstance(entries, dict):
+            raise ConfigError(f"{source}: task group '{group}' must be a mapping of tasks")
+        for name, entry in entries.items():
+            where = f"{source}: task '{group}.{name}'"
+            if not isinstance(entry, dict):
+                raise ConfigError(f"{where}: expected a mapping")
+            if name in tasks:
+                raise ConfigError(f"{where}: duplicate task name '{name}'")
+            agent = _require_str(entry, "agent", where)
+            if agent not in agents:
+                raise ConfigError(f"{where}: unknown agent '{agent}'")
+            tasks[name] = TaskConfig(
+                name=name,
+                group=group,
+                description=_require_str(entry, "description", where),
+                agent=agent,
+                tools=_tools(entry, where),
+            )
+    return tasks
+
+
+class ConfigLoader:
+    """
+    Loads and validates the app configuration from a directory.
+
+    Parsed files are shared through a process-wide cache keyed on modification
+    time, so constructing many loaders is cheap. ``reload_if_changed`` can be
+    called on every request; it only stats the files, at most once per
+    ``check_interval`` seconds.
+    """
+
+    def __init__(self, config_dir: Optional[str] = None, check_interval: float = 1.0):
+        self.config_dir = os.path.abspath(config_dir or DEFAULT_CONFIG_DIR)
+        self.check_interval = check_interval
+        self._last_check = time.monotonic()
+        self._lock = threading.Lock()
+        self.config = self._load()
+
+    def _paths(self) -> Tuple[str, str]:
+        return (os.path.join(self.config_dir, AGENTS_FILE),
+                os.path.join(self.config_dir, TASKS_FILE))
+
+    def _load(self) -> AppConfig:
+        agents_path, tasks_path = self._paths()
+        version = (_file_version(agents_path), _file_version(tasks_path))
+        with _cache_lock:
+            cached = _app_configs.get(self.config_dir)
+        if cached and cached.version == version:
+            return cached
+        agents = parse_agents(load_yaml(agents_path), agents_path)
+        tasks = parse_tasks(load_yaml(tasks_path), agents, tasks_path)
+        config = AppConfig(agents=agents, tasks=tasks, version=version)
+        with _cache_lock:
+            _app_configs[self.config_dir] = config
+        return config
+
+    def reload_if_changed(self, now: Optional[float] = None) -> bool:
+        """
+        Reload the configuration if either file changed on disk.
+
+        Returns:
+            bool: True if a new, valid configuration was loaded
+
+        Raises:
+            ConfigError: If the changed files fail validation; the previous
+                configuration stays active
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+            version = tuple(_file_version(path) for path in self._paths())
+            if version == self.config.version:
+                return False
+            self.config = self._load()
+            return True
@@ -11,64 +11,102 @@
 #-------------------------------------------------------------------------------------#
 
 from crewai import Crew, Process
-from typing import Dict, List, Any
-import yaml
-import os
+from typing import Dict, List, Any, Optional
+import logging
+import time
 
-from agents.chat_agent import ChatAgent
-from agents.scheduling_agent import SchedulingAgent
-from agents.content_agent import ContentAgent
-from agents.podcast_agent import PodcastAgent
-from utils.voice_utils import VoiceUtils
-from utils.db_utils import DatabaseUtils
+from app.agents.chat_agent import ChatAgent
+from app.agents.scheduling_agent import SchedulingAgent
+from app.agents.content_agent import ContentAgent
+from app.agents.podcast_agent import PodcastAgent
+from app.config.loader import AppConfig, ConfigError, ConfigLoader
+from app.models.message import Conversation, Message
+from app.utils.voice_utils import VoiceUtils
+from app.utils.db_utils import DatabaseUtils
+from app.utils.event_log import get_event_log
+
+# Maps agents.yaml entries to the short names used in self.agents and their classes
+AGENT_TYPES = {
+    'chat_agent': ('chat', ChatAgent),
+    'scheduling_agent': ('scheduling', SchedulingAgent),
+    'content_agent': ('content', ContentAgent),
+    'podcast_agent': ('podcast', PodcastAgent),
+}
+
+# Keywords that route a message to an agent's process_message, besides the chat agent
+AGENT_KEYWORDS = {
+    'scheduling': ['schedule', 'meeting', 'appointment', 'calendar'],
+    'content': ['content', 'post', 'blog', 'social media'],
+    'podcast': ['podcast', 'episode', 'show notes'],
+}
+
+def crewai_agent(agent: Any) -> Any:
+    """Return the crewai Agent wrapped by one of our agent classes"""
+    return getattr(agent, 'agent', None) or agent.chat_agent
 
 class AssistantCrew:
-    def __init__(self, config_path: str = "config"):
+    def __init__(self, config_path: Optional[str] = None):
         """Initialize the Assistant Crew with configuration"""
-        self.config_path = config_path
-        self.agents_config = self._load_config("agents.yaml")
-        self.tasks_config = self._load_config("tasks.yaml")
+        self.config_loader = ConfigLoader(config_path)
+        self.config_path = self.config_loader.config_dir
         
         # Initialize utilities
         self.voice_utils = VoiceUtils()
         self.db_utils = DatabaseUtils("assistant.db")
+        self.event_log = get_event_log()
         
         # Initialize agents
-        self.agents = self._initialize_agents()
+        self.agents = {}
+        self._apply_config(self.config_loader.config, previous=None)
+
+    @property
+    def agents_config(self) -> Dict:
+        """Validated agent configuration keyed by agents.yaml entry name"""
+        return self.config_loader.config.agents
+
+    @property
+    def tasks_config(self) -> Dict:
+        """Validated task configuration keyed by task name"""
+        return self.config_loader.config.tasks
+
+    def _apply_config(self, config: AppConfig, previous: Optional[AppConfig]) -> None:
+        """Build agents for a config, reusing those whose entry did not change"""
+        agents = {}
+        for name, agent_config in config.agents.items():
+            if name not in AGENT_TYPES:
+                logging.warning(f"No agent implementation for '{name}', skipping")
+                continue
+            key, agent_class = AGENT_TYPES[name]
+            unchanged = previous is not None and previous.agents.get(name) == agent_config
+            if unchanged and key in self.agents:
+                agents[key] = self.agents[key]
+            else:
+                agents[key] = agent_class(config=agent_config)
+        self.agents = agents
         
-        # Create the crew
+        # Create the crew from the crewai Agents wrapped by our agent classes
         self.crew = Crew(
-            agents=list(self.agents.values()),
+            agents=[crewai_agent(agent) for agent in self.agents.values()],
             process=Process.sequential  # Can be changed to hierarchical if needed
         )
 
-    def _load_config(self, filename: str) -> Dict:
-        """Load configuration from YAML file"""
-        config_file = os.path.join(self.config_path, filename)
-        with open(config_file, 'r') as f:
-            return yaml.safe_load(f)
-
-    def _initialize_agents(self) -> Dict:
-        """Initialize all agents from configuration"""
-        agents = {}
-        
-        # Initialize each agent type
-        if 'chat_agent' in self.agents_config:
-            agents['chat'] = ChatAgent()
-        
-        if 'scheduling_agent' in self.agents_config:
-            agents['scheduling'] = SchedulingAgent()
-            
-        if 'content_agent' in self.agents_config:
-            agents['content'] = ContentAgent()
-            
-        if 'podcast_agent' in self.agents_config:
-            agents['podcast'] = PodcastAgent()
-            
-        return agents
+    def reload_config(self) -> bool:
+        """Hot-reload configuration if the YAML files changed on disk"""
+        previous = self.config_loader.config
+        try:
+            changed = self.config_loader.reload_if_changed()
+        except ConfigError as e:
+            logging.error(f"Ignoring invalid configuration change: {str(e)}")
+            return False
+        if changed:
+            self._apply_config(self.config_loader.config, previous)
+            logging.info("Configuration reloaded")
+        return changed
 
     def process_user_input(self, user_input: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process user input and coordinate agent responses"""
+        self.reload_config()
+        started = time.perf_counter()
         try:
             # Determine which agents should handle the input
             # This could be enhanced with task classification
@@ -76,38 +114,46 @@ class AssistantCrew:
             
             # Chat agent always processes the input
             if 'chat' in self.agents:
-                chat_response = self.agents['chat'].process_message(user_input)
+                chat_response = self.agents['chat'].process_message(user_input, context)
                 results['chat'] = chat_response
             
-            # Check if input requires scheduling
-            if 'scheduling' in self.agents and any(keyword in user_input.lower() 
-                for keyword in ['schedule', 'meeting', 'appointment', 'calendar']):
-                schedule_response = self.agents['scheduling'].process_message(user_input)
-                results['scheduling'] = schedule_response
+            # Specialist agents that accept free-text messages also get a turn.
+            # Scheduling and content work is otherwise started by the chat agent as
+            # a background crew job (see results['chat']['crew_job_id']). A failing
+            # specialist never discards the chat answer.
+            for key, keywords in AGENT_KEYWORDS.items():
+                agent = self.agents.get(key)
+                if agent is None or not hasattr(agent, 'process_message'):
+                    continue
+                if any(keyword in user_input.lower() for keyword in keywords):
+                    try:
+                        results[key] = agent.process_message(user_input)
+                    except Exception as e:
+                        logging.error(f"Error in {key} agent: {str(e)}")
+                        results[key] = {"success": False, "error": str(e)}
             
-            # Check if input requires content creation
-            if 'content' in self.agents and any(keyword in user_input.lower() 
-                for keyword in ['content', 'post', 'blog', 'social media']):
-                content_response = self.agents['content'].process_message(user_input)
-                results['content'] = content_response
+            # Save the interaction as turns of the shared message model and other
+            # agents' output as JSON metadata (client-supplied history is not persisted twice)
+            metadata = {k: v for k, v in context.items() if k != 'history'} if context else {}
+            other_results = {k: v for k, v in results.items() if k != 'chat'}
+            if other_results:
+                metadata['agents'] = other_results
+            turns = Conversation([
+                Message("user", user_input),
+                Message("assistant", results.get('chat', {}).get('response', ''))
+            ])
+            self.db_utils.save_turns(turns, metadata=metadata or None)
             
-            # Check if input requires podcast handling
-            if 'podcast' in self.agents and any(keyword in user_input.lower() 
-                for keyword in ['podcast', 'episode', 'show notes']):
-                podcast_response = self.agents['podcast'].process_message(user_input)
-                results['podcast'] = podcast_response
-            
-            # Save the interaction
-            self.db_utils.save_conversation(
-                user_message=user_input,
-                ai_response=str(results),
-                metadata=context
+            self.event_log.log(
+                "assistant_request", success=True, agents=list(results),
+                latency_ms=(time.perf_counter() - started) * 1000
             )
-            
             return results
             
         except Exception as e:
             logging.error(f"Error processing user input: {str(e)}")
+            self.event_log.log("assistant_request", success=False, error=str(e),
+                               latency_ms=(time.perf_counter() - started) * 1000)
             return {"error": str(e)}
 
     def get_agent(self, agent_type: str):
@@ -120,9 +166,9 @@ class AssistantCrew:
             raise ValueError(f"Task {task_name} not found in configuration")
         
         task_config = self.tasks_config[task_name]
-        agent = self.agents.get(task_config['agent'])
+        agent = self.agents.get(AGENT_TYPES.get(task_config.agent, (task_config.agent,))[0])
         
         if not agent:
-            raise ValueError(f"Agent {task_config['agent']} not found")
+            raise ValueError(f"Agent {task_config.agent} not found")
         
         return agent.run_task(task_config, **kwargs)
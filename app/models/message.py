@@ -0,0 +1,160 @@
+#-------------------------------------------------------------------------------------#
+# File: message.py
+# Description: Compact, memory-bounded conversation model shared by frontend, agents
+#              and persistence
+# Author: @hams_ollo
+#
+# A single Conversation object holds each turn exactly once:
+# - Messages use __slots__ and interned role strings instead of per-turn dicts
+# - Older turns are zlib-compressed in place and decompressed only when read
+# - A per-session byte cap evicts the oldest turns once it is exceeded
+#-------------------------------------------------------------------------------------#
+import json
+import os
+import sys
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+ROLES = ("system", "user", "assistant")
+
+# Approximate fixed cost of one Message object and its list slot, in bytes
+MESSAGE_OVERHEAD = 120
+
+
+class Message:
+    """A single chat turn; content may be stored zlib-compressed"""
+
+    __slots__ = ("role", "created_at", "_text", "_packed")
+
+    def __init__(self, role: str, content: str, created_at: Optional[float] = None):
+        if role not in ROLES:
+            raise ValueError(f"Unknown message role: {role}")
+        self.role = sys.intern(role)
+        self.created_at = created_at if created_at is not None else time.time()
+        self._text: Optional[str] = content
+        self._packed: Optional[bytes] = None
+
+    @property
+    def content(self) -> str:
+        if self._text is not None:
+            return self._text
+        return zlib.decompress(self._packed).decode("utf-8")
+
+    @property
+    def compressed(self) -> bool:
+        return self._packed is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this message"""
+        payload = self._packed if self._packed is not None else self._text
+        return MESSAGE_OVERHEAD + sys.getsizeof(payload)
+
+    def compress(self, min_bytes: int = 256) -> bool:
+        """Compress the content in place if it is large enough to benefit"""
+        if self._text is None or len(self._text) < min_bytes:
+            return False
+        packed = zlib.compress(self._text.encode("utf-8"), 6)
+        if sys.getsizeof(packed) >= sys.getsizeof(self._text):
+            return False
+        self._packed, self._text = packed, None
+        return True
+
+    def to_dict(self) -> Dict[str, str]:
+        """The ``{role, content}`` form used by LLM APIs and JSON clients"""
+        return {"role": self.role, "content": self.content}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        return cls(data["role"], data["content"], data.get("created_at"))
+
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, chars={len(self.content)}, compressed={self.compressed})"
+
+
+class Conversation:
+    """
+    Ordered, memory-bounded list of Messages for one session.
+
+    The newest ``hot_messages`` turns stay uncompressed because they are read on
+    every completion; older turns are compressed as they age. When the total
+    size passes ``max_bytes`` the oldest turns are evicted (the newest
+    ``hot_messages`` are always kept). ``evicted`` counts dropped turns.
+    """
+
+    def __init__(self, messages: Iterable[Union[Message, Dict[str, Any]]] = (),
+                 max_bytes: Optional[int] = None, hot_messages: int = 20,
+                 compress_min_bytes: int = 256):
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("SESSION_MEMORY_MAX_BYTES", str(2 * 1024 * 1024))
+        )
+        self.hot_messages = hot_messages
+        self.compress_min_bytes = compress_min_bytes
+        self.evicted = 0
+        self._messages: List[Message] = []
+        self._nbytes = 0
+        for message in messages:
+            self.append(message)
+
+    @classmethod
+    def from_dicts(cls, messages: Iterable[Dict[str, Any]], **kwargs: Any) -> "Conversation":
+        return cls((Message.from_dict(m) for m in messages), **kwargs)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def append(self, role: Union[str, Message, Dict[str, Any]],
+               content: Optional[str] = None) -> Message:
+        """Append a turn given as ``(role, content)``, a Message or a dict"""
+        if isinstance(role, Message):
+            message = role
+        elif isinstance(role, dict):
+            message = Message.from_dict(role)
+        else:
+            message = Message(role, content if content is not None else "")
+        self._messages.append(message)
+        self._nbytes += message.nbytes
+
+        # Compress the turn that just left the hot window
+        if len(self._messages) > self.hot_messages:
+            aging = self._messages[-self.hot_messages - 1]
+            before = aging.nbytes
+            if aging.compress(self.compress_min_bytes):
+                self._nbytes += aging.nbytes - before
+        self._enforce_cap()
+        return message
+
+    def _enforce_cap(self) -> None:
+        while self._nbytes > self.max_bytes and len(self._messages) > self.hot_messages:
+            oldest = self._messages.pop(0)
+            self._nbytes -= oldest.nbytes
+            self.evicted += 1
+
+    def recent(self, count: int) -> List[Dict[str, str]]:
+        """The last ``count`` turns as ``{role, content}`` dicts"""
+        return [message.to_dict() for message in self._messages[-count:]] if count > 0 else []
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        return [message.to_dict() for message in self._messages]
+
+    def to_json(self) -> str:
+        """Compact JSON for persistence"""
+        return json.dumps(self.to_dicts(), separators=(",", ":"), ensure_ascii=False)
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._nbytes = 0
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index: int) -> Message:
+        return self._messages[index]
+
+    def __repr__(self) -> str:
+        return f"Conversation(messages={len(self)}, nbytes={self._nbytes}, evicted={self.evicted})"
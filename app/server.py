@@ -0,0 +1,317 @@
+#-------------------------------------------------------------------------------------#
+# File: server.py
+# Description: Headless HTTP/JSON API for the assistant, served over ASGI
+# Author: @hams_ollo
+#
+# Endpoints:
+# - GET  /health                  -> liveness and load information
+# - GET  /api/models              -> per-model latency, error and cost statistics
+# - POST /api/agent/chat          -> AssistantCrew.process_user_input
+# - POST /api/agent/chat/stream   -> chat answer streamed as newline-delimited JSON
+# - GET  /api/agent/crew?job_id=  -> poll background crew work started by a chat turn
+# - DELETE /api/agent/crew?job_id= -> cancel background crew work
+#
+# Request body: {"message": "string", "context": {}, "history": [...]}
+# ``history`` is optional; passing it keeps chat turns stateless so they can be
+# load-balanced across workers and processes. Background crew jobs live in the
+# worker that started them, so polling them needs one worker or sticky routing.
+#
+# Running:
+#   python -m app.server             (uses API_HOST, API_PORT, API_WORKERS=1)
+#   uvicorn app.server:app --workers 4 --port 8000   (sticky routing for crew polls)
+#
+# Each worker process builds one AssistantCrew (one shared Groq client and one
+# DatabaseUtils) on startup. Blocking agent calls run in a bounded thread pool and
+# requests beyond API_MAX_CONCURRENCY + API_MAX_QUEUE are rejected with 503.
+#-------------------------------------------------------------------------------------#
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HTTPError(Exception):
+    """Error carrying an HTTP status code that is returned as a JSON body"""
+
+    def __init__(self, status: int, message: str, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+class Backpressure:
+    """
+    Bounds in-flight work per worker.
+
+    At most ``max_concurrency`` requests run at once and at most ``max_queue``
+    more may wait; anything beyond that is rejected immediately so that a
+    load balancer can retry elsewhere instead of piling up latency here.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "Backpressure":
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.active >= self.max_concurrency and self.waiting >= self.max_queue:
+            raise HTTPError(503, "Server is busy, please retry",
+                            [(b"retry-after", b"1")])
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+
+class AssistantAPI:
+    """Minimal ASGI application exposing the assistant over HTTP/JSON"""
+
+    def __init__(self, crew_factory: Optional[Callable[[], Any]] = None,
+                 max_concurrency: Optional[int] = None, max_queue: Optional[int] = None):
+        self.crew_factory = crew_factory or _default_crew_factory
+        self.crew = None
+        max_concurrency = max_concurrency or int(os.getenv("API_MAX_CONCURRENCY", "8"))
+        self.backpressure = Backpressure(
+            max_concurrency,
+            max_queue if max_queue is not None else int(os.getenv("API_MAX_QUEUE", "32"))
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                           thread_name_prefix="assistant-api")
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ("GET", "/health"): self.health,
+            ("GET", "/api/models"): self.model_stats,
+            ("POST", "/api/agent/chat"): self.chat,
+            ("POST", "/api/agent/chat/stream"): self.chat_stream,
+            ("GET", "/api/agent/crew"): self.crew_job,
+            ("DELETE", "/api/agent/crew"): self.crew_job,
+        }
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        handler = self.routes.get((scope["method"], scope["path"]))
+        try:
+            if handler is None:
+                known_path = any(path == scope["path"] for _, path in self.routes)
+                raise HTTPError(405 if known_path else 404,
+                                "Method not allowed" if known_path else "Not found")
+            await handler(scope, receive, send)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"success": False, "error": e.message}, e.headers)
+        except Exception as e:
+            logger.error(f"Error handling {scope['path']}: {str(e)}")
+            await self._send_json(send, 500, {"success": False, "error": "Internal server error"})
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self._ensure_crew()
+                except Exception as e:
+                    logger.error(f"API startup failed: {str(e)}")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _ensure_crew(self) -> Any:
+        """Build the per-process crew once, off the event loop"""
+        if self.crew is None:
+            loop = asyncio.get_running_loop()
+            self.crew = await loop.run_in_executor(self.executor, self.crew_factory)
+        return self.crew
+
+    async def health(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        await self._send_json(send, 200, {
+            "status": "ok",
+            "active": self.backpressure.active,
+            "waiting": self.backpressure.waiting,
+        })
+
+    async def model_stats(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        crew = await self._ensure_crew()
+        chat_agent = crew.get_agent("chat")
+        router = getattr(chat_agent, "router", None)
+        if router is None:
+            raise HTTPError(503, "Model router is not available")
+        await self._send_json(send, 200, {"models": router.stats()})
+
+    async def chat(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        message, context = self._parse_chat_request(await self._read_json(receive))
+        async with self.backpressure:
+            crew = await self._ensure_crew()
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                self.executor, crew.process_user_input, message, context
+            )
+        chat_failed = results.get("chat", {}).get("success") is False
+        status = 500 if "error" in results or chat_failed else 200
+        await self._send_json(send, status, {"success": status == 200, "results": results})
+
+    async def crew_job(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        query = parse_qs(scope.get("query_string", b"").decode())
+        job_id = (query.get("job_id") or [""])[0]
+        if not job_id:
+            raise HTTPError(400, "'job_id' query parameter is required")
+        crew = await self._ensure_crew()
+        chat_agent = crew.get_agent("chat")
+        if chat_agent is None:
+            raise HTTPError(503, "Chat agent is not configured")
+        if scope["method"] == "DELETE":
+            await self._send_json(send, 200, {
+                "job_id": job_id, "cancelled": chat_agent.background_jobs.cancel(job_id)
+            })
+            return
+        job = chat_agent.get_crew_result(job_id)
+        await self._send_json(send, 404 if job["status"] is None else 200, job)
+
+    async def chat_stream(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        message, context = self._parse_chat_request(await self._read_json(receive))
+        async with self.backpressure:
+            crew = await self._ensure_crew()
+            chat_agent = crew.get_agent("chat")
+            if chat_agent is None:
+                raise HTTPError(503, "Chat agent is not configured")
+
+            loop = asyncio.get_running_loop()
+            chunks = await loop.run_in_executor(
+                self.executor, chat_agent.stream_message, message, context
+            )
+            done = object()
+            started = False
+            try:
+                while True:
+                    chunk = await loop.run_in_executor(self.executor, next, chunks, done)
+                    if chunk is done:
+                        break
+                    if not started:
+                        await send({"type": "http.response.start", "status": 200,
+                                    "headers": [(b"content-type", b"application/x-ndjson")]})
+                        started = True
+                    await send({"type": "http.response.body", "more_body": True,
+                                "body": json.dumps({"delta": chunk}).encode() + b"\n"})
+                final = {"done": True}
+            except Exception as e:
+                if not started:
+                    raise
+                logger.error(f"Error streaming chat response: {str(e)}")
+                final = {"done": True, "error": str(e)}
+            if not started:
+                await send({"type": "http.response.start", "status": 200,
+                            "headers": [(b"content-type", b"application/x-ndjson")]})
+            await send({"type": "http.response.body",
+                        "body": json.dumps(final).encode() + b"\n"})
+
+    @staticmethod
+    def _parse_chat_request(body: Any) -> Tuple[str, Dict[str, Any]]:
+        """Validate a chat request body and fold ``history`` into the context"""
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        message = body.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "'message' must be a non-empty string")
+        context = body.get("context") or {}
+        if not isinstance(context, dict):
+            raise HTTPError(400, "'context' must be an object")
+        history = body.get("history")
+        if history is not None:
+            if not isinstance(history, list) or not all(
+                isinstance(m, dict) and m.get("role") in ("user", "assistant")
+                and isinstance(m.get("content"), str) for m in history
+            ):
+                raise HTTPError(400, "'history' must be a list of {role, content} messages")
+            context = {**context, "history": history}
+        else:
+            # Without client-side history each request is an independent turn
+            context = {**context, "history": []}
+        return message, context
+
+    @staticmethod
+    async def _read_json(receive: Callable) -> Any:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            if not message.get("more_body"):
+                break
+        try:
+            return json.loads(body or b"null")
+        except ValueError:
+            raise HTTPError(400, "Request body must be valid JSON")
+
+    @staticmethod
+    async def _send_json(send: Callable, status: int, payload: Dict[str, Any],
+                         headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        body = json.dumps(payload, default=str).encode()
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode()),
+                                *(headers or [])]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _default_crew_factory() -> Any:
+    from app.crew import AssistantCrew
+    return AssistantCrew()
+
+
+app = AssistantAPI()
+
+
+def main() -> None:
+    """Run the API with uvicorn using API_HOST, API_PORT and API_WORKERS"""
+    import uvicorn
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # Crew jobs are kept in-process, so a single worker is the safe default
+    workers = int(os.getenv("API_WORKERS", "1"))
+    if workers > 1:
+        logger.warning("API_WORKERS > 1: crew job polls must be routed to the worker "
+                       "that started the job (sticky sessions)")
+    uvicorn.run(
+        "app.server:app",
+        host=os.getenv("API_HOST", "127.0.0.1"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#-------------------------------------------------------------------------------------#
+# File: background_jobs.py
+# Description: Background executor for crew runs with polling, callbacks and cancellation
+# Author: @hams_ollo
+#
+# Crew runs are much slower than a single chat completion, so they are started in the
+# background and their results are delivered as a follow-up message instead of
+# holding back the main answer.
+#-------------------------------------------------------------------------------------#
+import logging
+import threading
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class BackgroundJobs:
+    """
+    Runs callables on background threads and tracks them by job id.
+
+    At most ``max_workers`` jobs run at once; the rest wait in FIFO order.
+    Results can be polled with ``status`` or delivered through an ``on_done``
+    callback. Cancelling a job that has not started prevents it from running.
+    Cancelling a running job discards its result, suppresses the callback,
+    sets the job's cancel event and frees its slot immediately, so abandoned
+    work never holds back new jobs. Callables submitted with
+    ``with_cancel_event=True`` receive that event and should stop early once
+    it is set. Finished jobs are forgotten once they have been read via
+    ``pop``, or when more than ``max_finished`` accumulate.
+    """
+
+    def __init__(self, max_workers: int = 4, max_finished: int = 1000):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Deque[str] = deque()
+        self._active = 0
+        self._threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any],
+               on_done: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+               with_cancel_event: bool = False) -> str:
+        """Schedule ``fn`` and return its job id"""
+        job_id = uuid.uuid4().hex
+        job = {"status": PENDING, "result": None, "error": None, "fn": fn,
+               "on_done": on_done, "with_cancel_event": with_cancel_event,
+               "cancel_event": threading.Event(), "holds_slot": False}
+        with self._lock:
+            self._jobs[job_id] = job
+            self._queue.append(job_id)
+            self._dispatch()
+        return job_id
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while slots are free (lock held)"""
+        while self._active < self.max_workers and self._queue:
+            job_id = self._queue.popleft()
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != PENDING:
+                continue
+            job.update(status=RUNNING, holds_slot=True)
+            self._active += 1
+            thread = threading.Thread(target=self._run, args=(job_id, job),
+                                      name=f"crew-job-{job_id[:8]}", daemon=True)
+            self._threads[job_id] = thread
+            thread.start()
+
+    def _release(self, job: Dict[str, Any]) -> None:
+        """Give a job's slot to the next queued job (lock held)"""
+        if job["holds_slot"]:
+            job["holds_slot"] = False
+            self._active -= 1
+            self._dispatch()
+
+    def _run(self, job_id: str, job: Dict[str, Any]) -> None:
+        fn = job["fn"]
+        try:
+            result = fn(job["cancel_event"]) if job["with_cancel_event"] else fn()
+            error, status = None, DONE
+        except Exception as e:
+            logging.error(f"Background job {job_id} failed: {str(e)}")
+            result, error, status = None, str(e), FAILED
+        with self._lock:
+            self._threads.pop(job_id, None)
+            self._release(job)
+            if job["status"] == CANCELLED:
+                return
+            job.update(status=status, result=result, error=error)
+            self._trim()
+        on_done = job["on_done"]
+        if on_done:
+            try:
+                on_done(job_id, self.status(job_id))
+            except Exception as e:
+                logging.error(f"Background job callback for {job_id} failed: {str(e)}")
+
+    def _trim(self) -> None:
+        """Drop the oldest finished jobs beyond ``max_finished`` (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job["status"] in (DONE, FAILED, CANCELLED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    @property
+    def active(self) -> int:
+        """Number of jobs currently holding a worker slot"""
+        with self._lock:
+            return self._active
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """Return ``{"job_id", "status", "result", "error"}`` for a job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"job_id": job_id, "status": None, "result": None,
+                        "error": "Unknown job"}
+            return {"job_id": job_id, "status": job["status"],
+                    "result": job["result"], "error": job["error"]}
+
+    def pop(self, job_id: str) -> Dict[str, Any]:
+        """Return a job's status and forget it if it has finished"""
+        status = self.status(job_id)
+        if status["status"] in (DONE, FAILED, CANCELLED):
+            with self._lock:
+                self._jobs.pop(job_id, None)
+        return status
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a pending or running job; returns False if it already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in (DONE, FAILED, CANCELLED):
+                return False
+            job["status"] = CANCELLED
+            job["cancel_event"].set()
+            self._release(job)
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for threads that are still running, including cancelled ones"""
+        with self._lock:
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+_jobs: Optional[BackgroundJobs] = None
+_jobs_lock = threading.Lock()
+
+
+def get_background_jobs() -> BackgroundJobs:
+    """Return the process-wide background job runner"""
+    global _jobs
+    with _jobs_lock:
+        if _jobs is None:
+            _jobs = BackgroundJobs()
+        return _jobs
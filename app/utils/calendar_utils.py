@@ -0,0 +1,484 @@
+#-------------------------------------------------------------------------------------#
+# File: calendar_utils.py
+# Description: Local calendar engine used by the scheduling agent
+# Author: @hams_ollo
+#
+# This module provides:
+# - An in-memory interval index for fast overlap queries on calendar events
+# - A SQLite-backed calendar store with one index per calendar owner
+# - Free-slot search that intersects availability across many participants
+# - Minimal ICS import/export for local testing
+#
+# All time arithmetic happens here; the LLM is never asked to reason about ranges.
+#-------------------------------------------------------------------------------------#
+import bisect
+import logging
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.db_utils import DatabaseUtils
+
+Interval = Tuple[float, float]
+
+
+def to_timestamp(value: Any) -> float:
+    """Convert a datetime, ISO string or number to a UTC epoch timestamp"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise TypeError(f"Unsupported time value: {value!r}")
+
+
+def from_timestamp(value: float) -> datetime:
+    """Convert a UTC epoch timestamp back to an aware datetime"""
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class IntervalIndex:
+    """
+    Overlap index over half-open ``[start, end)`` intervals.
+
+    Intervals are kept sorted by start time and organised as an implicit
+    balanced tree over that array, where every node stores the maximum end
+    time of its subtree. Overlap queries then prune whole subtrees in
+    O(log n + k). New intervals land in a small buffer that is merged into
+    the tree once it grows past ``buffer_size``, so interleaved inserts and
+    queries stay cheap.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[float, float, Any]] = (),
+                 buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        self._keys: List[Any] = []
+        self._max_end: List[float] = []
+        self._pending: List[Tuple[float, float, Any]] = []
+        # Tombstones are whole (start, end, key) entries so that re-adding a key
+        # with a new interval never resurrects the old one
+        self._removed: set = set()
+        self._spans: Dict[Any, Interval] = {}
+        self._rebuild(list(intervals))
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def add(self, start: float, end: float, key: Any) -> None:
+        """Insert an interval identified by ``key``, replacing any previous one"""
+        if end <= start:
+            raise ValueError(f"Interval end must be after start: {start} >= {end}")
+        previous = self._spans.get(key)
+        if previous == (start, end):
+            return
+        if previous is not None:
+            self._removed.add((previous[0], previous[1], key))
+        self._spans[key] = (start, end)
+        if (start, end, key) in self._removed:
+            # The entry is still stored and only tombstoned; revive it in place
+            self._removed.discard((start, end, key))
+        else:
+            self._pending.append((start, end, key))
+        if len(self._pending) > self.buffer_size or len(self._removed) > self.buffer_size:
+            self._rebuild(self._items())
+
+    def add_many(self, intervals: Iterable[Tuple[float, float, Any]]) -> None:
+        """
+        Insert or replace many intervals at once.
+
+        Small batches go through ``add``; larger ones apply every replacement
+        and then rebuild the tree once, so bulk loads stay O(n log n) instead
+        of paying for a merge every ``buffer_size`` items.
+        """
+        batch = list(intervals)
+        if len(batch) <= self.buffer_size:
+            for start, end, key in batch:
+                self.add(start, end, key)
+            return
+        for start, end, key in batch:
+            if end <= start:
+                raise ValueError(f"Interval end must be after start: {start} >= {end}")
+        for start, end, key in batch:
+            previous = self._spans.get(key)
+            if previous is not None:
+                self._removed.add((previous[0], previous[1], key))
+            self._spans[key] = (start, end)
+        # Tombstoned old entries are dropped by _items; the batch itself is kept
+        # as-is, and _rebuild keeps the last entry per key
+        self._rebuild(self._items() + batch)
+
+    def remove(self, key: Any) -> None:
+        """Remove the interval identified by ``key`` (lazily, on next merge)"""
+        span = self._spans.pop(key, None)
+        if span is None:
+            return
+        self._removed.add((span[0], span[1], key))
+        if len(self._removed) > self.buffer_size:
+            self._rebuild(self._items())
+
+    def overlapping(self, start: float, end: float) -> List[Tuple[float, float, Any]]:
+        """Return all intervals overlapping ``[start, end)`` ordered by start"""
+        found: List[Tuple[float, float, Any]] = []
+        hi = bisect.bisect_left(self._starts, end)
+        self._query(hi, start, found)
+        for item in self._pending:
+            if item[0] < end and item[1] > start:
+                found.append(item)
+        if self._removed:
+            found = [item for item in found if item not in self._removed]
+        found.sort(key=lambda item: (item[0], item[1]))
+        return found
+
+    def _query(self, hi: int, start: float, found: List[Tuple[float, float, Any]]) -> None:
+        """Collect intervals in ``[0, hi)`` whose end lies after ``start``"""
+        # Every index below ``hi`` already starts before the query end, so only
+        # the end times need checking; subtrees whose max end is too early are
+        # skipped wholesale.
+        stack = [(0, len(self._starts))]
+        while stack:
+            node_lo, node_hi = stack.pop()
+            if node_lo >= node_hi or node_lo >= hi:
+                continue
+            mid = (node_lo + node_hi) // 2
+            if self._max_end[mid] <= start:
+                continue
+            stack.append((node_lo, mid))
+            if mid < hi:
+                if self._ends[mid] > start:
+                    found.append((self._starts[mid], self._ends[mid], self._keys[mid]))
+                stack.append((mid + 1, node_hi))
+
+    def _items(self) -> List[Tuple[float, float, Any]]:
+        items = [
+            item for item in zip(self._starts, self._ends, self._keys)
+            if item not in self._removed
+        ]
+        items.extend(item for item in self._pending if item not in self._removed)
+        return items
+
+    def _rebuild(self, items: List[Tuple[float, float, Any]]) -> None:
+        # Later entries for the same key win, as with repeated ``add`` calls
+        items = list({item[2]: item for item in items}.values())
+        self._spans = {key: (start, end) for start, end, key in items}
+        items.sort(key=lambda item: (item[0], item[1]))
+        self._starts = [item[0] for item in items]
+        self._ends = [item[1] for item in items]
+        self._keys = [item[2] for item in items]
+        self._max_end = list(self._ends)
+        self._pending = []
+        self._removed = set()
+        self._build_max(0, len(items))
+
+    def _build_max(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        best = max(self._ends[mid], self._build_max(lo, mid), self._build_max(mid + 1, hi))
+        self._max_end[mid] = best
+        return best
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping or touching intervals into a sorted, disjoint list"""
+    merged: List[List[float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def free_slots(busy: Iterable[Interval], window_start: float, window_end: float,
+               duration: float, step: Optional[float] = None) -> List[Interval]:
+    """
+    Find free slots of at least ``duration`` seconds inside a window.
+
+    Args:
+        busy (Iterable[Interval]): Busy intervals from any number of calendars
+        window_start (float): Start of the search window (epoch seconds)
+        window_end (float): End of the search window (epoch seconds)
+        duration (float): Required slot length in seconds
+        step (Optional[float]): If given, split each gap into back-to-back
+            candidate slots of ``duration`` aligned to this step
+
+    Returns:
+        List[Interval]: Free ``(start, end)`` slots ordered by start
+    """
+    slots: List[Interval] = []
+    cursor = window_start
+    clipped = (
+        (max(s, window_start), min(e, window_end))
+        for s, e in busy if s < window_end and e > window_start
+    )
+    for start, end in merge_intervals(clipped) + [(window_end, window_end)]:
+        if start - cursor >= duration:
+            if step:
+                slot_start = window_start + -(-(cursor - window_start) // step) * step
+                while slot_start + duration <= start:
+                    slots.append((slot_start, slot_start + duration))
+                    slot_start += step
+            else:
+                slots.append((cursor, start))
+        cursor = max(cursor, end)
+    return slots
+
+
+def working_hours(window_start: float, window_end: float, day_start: int = 9,
+                  day_end: int = 17, weekdays_only: bool = True) -> List[Interval]:
+    """Return the out-of-hours intervals in a window, to be treated as busy"""
+    blocked: List[Interval] = []
+    day = from_timestamp(window_start).replace(hour=0, minute=0, second=0, microsecond=0)
+    cursor = window_start
+    while day.timestamp() < window_end:
+        open_at = (day + timedelta(hours=day_start)).timestamp()
+        close_at = (day + timedelta(hours=day_end)).timestamp()
+        next_day = day + timedelta(days=1)
+        if weekdays_only and day.weekday() >= 5:
+            blocked.append((cursor, next_day.timestamp()))
+        else:
+            if open_at > cursor:
+                blocked.append((cursor, open_at))
+            blocked.append((max(close_at, cursor), next_day.timestamp()))
+        cursor = next_day.timestamp()
+        day = next_day
+    return [(s, min(e, window_end)) for s, e in blocked if s < min(e, window_end)]
+
+
+def group_overlapping(events: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Cluster events into groups of overlapping events; lone events are dropped"""
+    clusters: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_end = float("-inf")
+    for event in sorted(events, key=lambda e: (e["start_ts"], e["end_ts"])):
+        if current and event["start_ts"] < current_end:
+            current.append(event)
+            current_end = max(current_end, event["end_ts"])
+        else:
+            if len(current) > 1:
+                clusters.append(current)
+            current = [event]
+            current_end = event["end_ts"]
+    if len(current) > 1:
+        clusters.append(current)
+    return clusters
+
+
+class CalendarStore:
+    """SQLite-backed calendar with one in-memory interval index per owner"""
+
+    def __init__(self, db_utils: Optional[DatabaseUtils] = None, db_path: str = "assistant.db"):
+        self.db_utils = db_utils or DatabaseUtils(db_path)
+        self._indexes: Dict[str, IntervalIndex] = {}
+        self._events: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def _index_for(self, owner: str) -> IntervalIndex:
+        """Load an owner's events from the database on first use"""
+        if owner not in self._indexes:
+            events = self.db_utils.get_calendar_events(owner)
+            self._events[owner] = {event["uid"]: event for event in events}
+            self._indexes[owner] = IntervalIndex(
+                (event["start_ts"], event["end_ts"], event["uid"]) for event in events
+            )
+        return self._indexes[owner]
+
+    def add_event(self, owner: str, title: str, start: Any, end: Any,
+                  uid: Optional[str] = None, metadata: Optional[Dict] = None) -> Dict[str, Any]:
+        """Add a single event and persist it"""
+        return self.add_events(owner, [{
+            "uid": uid, "title": title, "start": start, "end": end, "metadata": metadata
+        }])[0]
+
+    def add_events(self, owner: str, events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Bulk-add events (dicts with title/start/end and optional uid/metadata)"""
+        index = self._index_for(owner)
+        records = []
+        for event in events:
+            record = {
+                "uid": event.get("uid") or uuid.uuid4().hex,
+                "owner": owner,
+                "title": event.get("title", ""),
+                "start_ts": to_timestamp(event["start"]),
+                "end_ts": to_timestamp(event["end"]),
+                "metadata": event.get("metadata"),
+            }
+            if record["end_ts"] <= record["start_ts"]:
+                raise ValueError(f"Event '{record['title']}' ends before it starts")
+            records.append(record)
+        self.db_utils.save_calendar_events(records)
+        for record in records:
+            self._events[owner][record["uid"]] = record
+        # Replaces any previous interval stored under the same uid
+        index.add_many((record["start_ts"], record["end_ts"], record["uid"]) for record in records)
+        return records
+
+    def remove_event(self, owner: str, uid: str) -> bool:
+        """Delete an event by uid"""
+        index = self._index_for(owner)
+        if uid not in self._events[owner]:
+            return False
+        self.db_utils.delete_calendar_event(owner, uid)
+        index.remove(uid)
+        del self._events[owner][uid]
+        return True
+
+    def events_between(self, owner: str, start: Any, end: Any) -> List[Dict[str, Any]]:
+        """Return an owner's events overlapping ``[start, end)``"""
+        index = self._index_for(owner)
+        events = self._events[owner]
+        return [events[key] for _, _, key in index.overlapping(to_timestamp(start), to_timestamp(end))]
+
+    def busy_intervals(self, owner: str, start: Any, end: Any) -> List[Interval]:
+        """Return merged busy intervals for an owner within ``[start, end)``"""
+        index = self._index_for(owner)
+        return merge_intervals(
+            (s, e) for s, e, _ in index.overlapping(to_timestamp(start), to_timestamp(end))
+        )
+
+    def find_common_slots(self, participants: Iterable[str], duration: timedelta,
+                          window_start: Any, window_end: Any,
+                          step: Optional[timedelta] = None,
+                          extra_busy: Iterable[Interval] = ()) -> List[Interval]:
+        """Find slots where every participant is free for ``duration``"""
+        start, end = to_timestamp(window_start), to_timestamp(window_end)
+        busy: List[Interval] = list(extra_busy)
+        for participant in participants:
+            busy.extend(self.busy_intervals(participant, start, end))
+        return free_slots(
+            busy, start, end, duration.total_seconds(),
+            step.total_seconds() if step else None
+        )
+
+    def find_conflicts(self, owner: str, start: Optional[Any] = None,
+                       end: Optional[Any] = None) -> List[List[Dict[str, Any]]]:
+        """Group an owner's events into clusters of mutually overlapping events"""
+        self._index_for(owner)
+        if start is None or end is None:
+            events = list(self._events[owner].values())
+        else:
+            events = self.events_between(owner, start, end)
+        return group_overlapping(events)
+
+    def import_ics(self, owner: str, ics_text: str) -> int:
+        """Import VEVENTs from ICS text; returns the number of events imported"""
+        events = parse_ics(ics_text)
+        self.add_events(owner, events)
+        return len(events)
+
+    def export_ics(self, owner: str, start: Optional[Any] = None, end: Optional[Any] = None) -> str:
+        """Export an owner's events (optionally within a range) as ICS text"""
+        self._index_for(owner)
+        if start is None or end is None:
+            events = sorted(self._events[owner].values(), key=lambda e: e["start_ts"])
+        else:
+            events = self.events_between(owner, start, end)
+        return build_ics(events)
+
+
+def _unfold_ics_lines(ics_text: str) -> List[str]:
+    """Join RFC 5545 folded continuation lines"""
+    lines: List[str] = []
+    for raw in ics_text.splitlines():
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        elif raw:
+            lines.append(raw)
+    return lines
+
+
+def _parse_ics_datetime(params: str, value: str) -> datetime:
+    if "VALUE=DATE" in params.upper() or len(value) == 8:
+        parsed = datetime.combine(date(int(value[:4]), int(value[4:6]), int(value[6:8])),
+                                  datetime.min.time())
+        return parsed.replace(tzinfo=timezone.utc)
+    parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    # Floating and TZID-qualified times are treated as UTC for local testing
+    return parsed.replace(tzinfo=timezone.utc)
+
+
+def _escape_ics(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _unescape_ics(text: str) -> str:
+    return (text.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def parse_ics(ics_text: str) -> List[Dict[str, Any]]:
+    """Parse VEVENT blocks into event dicts with uid/title/start/end"""
+    events: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    for line in _unfold_ics_lines(ics_text):
+        name_part, _, value = line.partition(":")
+        name, _, params = name_part.partition(";")
+        name = name.upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            current = {}
+        elif name == "END" and value.upper() == "VEVENT" and current is not None:
+            if "start" in current:
+                if "end" not in current:
+                    current["end"] = current["start"] + current.pop("duration", timedelta(days=1))
+                current.pop("duration", None)
+                events.append(current)
+            else:
+                logging.error(f"Skipping VEVENT without DTSTART: {current.get('uid')}")
+            current = None
+        elif current is not None:
+            if name == "UID":
+                current["uid"] = value
+            elif name == "SUMMARY":
+                current["title"] = _unescape_ics(value)
+            elif name == "DTSTART":
+                current["start"] = _parse_ics_datetime(params, value)
+            elif name == "DTEND":
+                current["end"] = _parse_ics_datetime(params, value)
+            elif name == "DURATION":
+                current["duration"] = _parse_ics_duration(value)
+    return events
+
+
+def _parse_ics_duration(value: str) -> timedelta:
+    """Parse the subset of ISO 8601 durations used by calendar clients"""
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("+-").lstrip("P")
+    total = timedelta()
+    number = ""
+    in_time = False
+    units = {"W": "weeks", "D": "days", "H": "hours", "M": "minutes", "S": "seconds"}
+    for char in value:
+        if char == "T":
+            in_time = True
+        elif char.isdigit():
+            number += char
+        elif char in units and number:
+            if char == "M" and not in_time:
+                raise ValueError(f"Unsupported ICS duration: {value}")
+            total += timedelta(**{units[char]: int(number)})
+            number = ""
+    return sign * total
+
+
+def build_ics(events: Iterable[Dict[str, Any]]) -> str:
+    """Serialise event dicts (as returned by CalendarStore) to ICS text"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//OlloOps AI//Calendar//EN"]
+    for event in events:
+        lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{event['uid']}",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{from_timestamp(event['start_ts']).strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTEND:{from_timestamp(event['end_ts']).strftime('%Y%m%dT%H%M%SZ')}",
+            f"SUMMARY:{_escape_ics(event.get('title') or '')}",
+            "END:VEVENT",
+        ])
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
@@ -3,6 +3,8 @@ from typing import List, Dict, Any, Optional
 import json
 import logging
 
+from app.models.message import Conversation, Message
+
 class DatabaseUtils:
     def __init__(self, db_path: str):
         """Initialize database connection"""
@@ -22,9 +24,14 @@ class DatabaseUtils:
                         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                         user_message TEXT,
                         ai_response TEXT,
-                        metadata TEXT
+                        metadata TEXT,
+                        turns TEXT
                     )
                 ''')
+                # Databases created before turns were stored get the column added
+                columns = {row[1] for row in cursor.execute('PRAGMA table_info(conversations)')}
+                if 'turns' not in columns:
+                    cursor.execute('ALTER TABLE conversations ADD COLUMN turns TEXT')
 
                 # Create podcast_episodes table
                 cursor.execute('''
@@ -51,6 +58,23 @@ class DatabaseUtils:
                     )
                 ''')
 
+                # Create calendar_events table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS calendar_events (
+                        uid TEXT NOT NULL,
+                        owner TEXT NOT NULL,
+                        title TEXT,
+                        start_ts REAL NOT NULL,
+                        end_ts REAL NOT NULL,
+                        metadata TEXT,
+                        PRIMARY KEY (owner, uid)
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_calendar_events_owner_start
+                    ON calendar_events (owner, start_ts)
+                ''')
+
                 conn.commit()
         except Exception as e:
             logging.error(f"Error initializing database: {str(e)}")
@@ -58,12 +82,25 @@ class DatabaseUtils:
 
     def save_conversation(self, user_message: str, ai_response: str, metadata: Optional[Dict] = None) -> int:
         """Save a conversation interaction"""
+        turns = Conversation([Message("user", user_message), Message("assistant", ai_response)])
+        return self.save_turns(turns, metadata)
+
+    def save_turns(self, turns: Conversation, metadata: Optional[Dict] = None) -> int:
+        """
+        Save one interaction given as Conversation turns.
+
+        The turns are stored in the shared message format (``Conversation.to_json``);
+        the first user message and last assistant reply are also kept as plain text.
+        """
+        user_message = next((m.content for m in turns if m.role == "user"), "")
+        ai_response = next((m.content for m in reversed(list(turns)) if m.role == "assistant"), "")
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    'INSERT INTO conversations (user_message, ai_response, metadata) VALUES (?, ?, ?)',
-                    (user_message, ai_response, json.dumps(metadata) if metadata else None)
+                    'INSERT INTO conversations (user_message, ai_response, metadata, turns) VALUES (?, ?, ?, ?)',
+                    (user_message, ai_response, json.dumps(metadata) if metadata else None,
+                     turns.to_json())
                 )
                 return cursor.lastrowid
         except Exception as e:
@@ -109,7 +146,7 @@ class DatabaseUtils:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
-                    'SELECT * FROM conversations ORDER BY timestamp DESC LIMIT ?',
+                    'SELECT * FROM conversations ORDER BY timestamp DESC, id DESC LIMIT ?',
                     (limit,)
                 )
                 return [dict(row) for row in cursor.fetchall()]
@@ -117,6 +154,21 @@ class DatabaseUtils:
             logging.error(f"Error retrieving conversation history: {str(e)}")
             return []
 
+    def get_conversation(self, limit: int = 10, **kwargs: Any) -> Conversation:
+        """
+        Load the most recent interactions as one Conversation, oldest turn first.
+
+        Extra keyword arguments are passed to ``Conversation`` (e.g. ``max_bytes``).
+        """
+        turns = []
+        for row in reversed(self.get_conversation_history(limit)):
+            if row.get('turns'):
+                turns.extend(json.loads(row['turns']))
+            else:
+                turns.extend([{"role": "user", "content": row['user_message'] or ""},
+                              {"role": "assistant", "content": row['ai_response'] or ""}])
+        return Conversation.from_dicts(turns, **kwargs)
+
     def get_podcast_episodes(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieve podcast episodes"""
         try:
@@ -131,3 +183,55 @@ class DatabaseUtils:
         except Exception as e:
             logging.error(f"Error retrieving podcast episodes: {str(e)}")
             return []
+
+    def save_calendar_events(self, events: List[Dict[str, Any]]) -> int:
+        """Insert or replace calendar events in a single transaction"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    '''INSERT OR REPLACE INTO calendar_events
+                       (uid, owner, title, start_ts, end_ts, metadata)
+                       VALUES (?, ?, ?, ?, ?, ?)''',
+                    [
+                        (event["uid"], event["owner"], event.get("title"),
+                         event["start_ts"], event["end_ts"],
+                         json.dumps(event["metadata"]) if event.get("metadata") else None)
+                        for event in events
+                    ]
+                )
+                return len(events)
+        except Exception as e:
+            logging.error(f"Error saving calendar events: {str(e)}")
+            raise
+
+    def get_calendar_events(self, owner: str) -> List[Dict[str, Any]]:
+        """Retrieve all calendar events for an owner ordered by start time"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute(
+                    'SELECT * FROM calendar_events WHERE owner = ? ORDER BY start_ts',
+                    (owner,)
+                )
+                events = [dict(row) for row in cursor.fetchall()]
+                for event in events:
+                    event["metadata"] = json.loads(event["metadata"]) if event["metadata"] else None
+                return events
+        except Exception as e:
+            logging.error(f"Error retrieving calendar events: {str(e)}")
+            return []
+
+    def delete_calendar_event(self, owner: str, uid: str) -> bool:
+        """Delete a calendar event"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    'DELETE FROM calendar_events WHERE owner = ? AND uid = ?',
+                    (owner, uid)
+                )
+                return cursor.rowcount > 0
+        except Exception as e:
+            logging.error(f"Error deleting calendar event: {str(e)}")
+            return False
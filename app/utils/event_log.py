@@ -0,0 +1,312 @@
+#-------------------------------------------------------------------------------------#
+# File: event_log.py
+# Description: Append-only JSONL request event log and offline analytics export
+# Author: @hams_ollo
+#
+# This module manages:
+# - A buffered background writer that appends one JSON line per request event
+# - Size-based rotation into closed, immutable segments
+# - Compaction of closed segments into columnar Parquet files via pandas
+#
+# Each process appends to its own active segment, so several API workers can
+# share one directory without interleaving lines.
+#
+# Environment:
+#   EVENT_LOG_DIR       -> directory for segments (default logs/events)
+#   EVENT_LOG_ENABLED   -> set to false to disable logging
+#
+# Compaction:
+#   python -m app.utils.event_log compact --output analytics/events
+#-------------------------------------------------------------------------------------#
+import argparse
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ACTIVE_SEGMENT = "events.{pid}.active.jsonl"
+ACTIVE_PATTERN = re.compile(r"^events\.(\d+)\.active\.jsonl$")
+SEGMENT_PATTERN = "events-*.jsonl"
+CORRUPT_SUFFIX = ".corrupt"
+
+
+class EventLog:
+    """
+    Buffered, size-rotated JSONL event log.
+
+    ``log`` never blocks the request path: events go onto a bounded queue and a
+    daemon thread writes them in batches. If the queue is full the event is
+    dropped and counted in ``dropped``. When the active segment exceeds
+    ``max_bytes`` it is renamed to ``events-<utc timestamp>-<id>.jsonl`` and a
+    new one is started; only closed segments are picked up by compaction.
+    Pending events are flushed and the active segment closed on ``close``,
+    which also runs at interpreter exit. Active segments left behind by
+    processes that died without closing are adopted on startup.
+    """
+
+    def __init__(self, directory: str = "logs/events", max_bytes: int = 16 * 1024 * 1024,
+                 flush_interval: float = 1.0, max_queue: int = 10000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._active_path = os.path.join(directory, ACTIVE_SEGMENT.format(pid=os.getpid()))
+        os.makedirs(directory, exist_ok=True)
+        adopt_orphaned_segments(directory)
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+        # The writer is a daemon thread, so drain the queue before the process exits
+        atexit.register(self.close)
+
+    @property
+    def active_path(self) -> str:
+        return self._active_path
+
+    def log(self, kind: str, **fields: Any) -> None:
+        """Queue an event of the given kind; extra fields become columns"""
+        if self._closed:
+            return
+        event = {"ts": datetime.now(timezone.utc).isoformat(), "kind": kind, **fields}
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every event queued so far has been written"""
+        done = threading.Event()
+        self._queue.put({"__flush__": done})
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending events, stop the writer thread and close the active segment"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+        if not self._thread.is_alive():
+            try:
+                self._rotate_active()
+            except OSError as e:
+                logging.error(f"Error closing event log segment: {str(e)}")
+
+    def rotate(self) -> Optional[str]:
+        """Close the active segment now; returns the closed segment path"""
+        done = threading.Event()
+        result: Dict[str, Optional[str]] = {}
+        self._queue.put({"__rotate__": done, "__result__": result})
+        done.wait(5.0)
+        return result.get("path")
+
+    @staticmethod
+    def _is_control(item: Optional[Dict[str, Any]]) -> bool:
+        """True for the shutdown sentinel and flush/rotate requests, which end a batch"""
+        return item is None or "__flush__" in item or "__rotate__" in item
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while not self._is_control(batch[-1]) and len(batch) < 1000:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logging.error(f"Error writing event log: {str(e)}")
+            if batch[-1] is None:
+                return
+
+    def _write(self, batch: List[Optional[Dict[str, Any]]]) -> None:
+        lines = [
+            json.dumps(event, default=str) + "\n" for event in batch
+            if not self._is_control(event)
+        ]
+        if lines:
+            with open(self.active_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        control = batch[-1] if batch[-1] is not None and self._is_control(batch[-1]) else None
+        force_rotate = control is not None and "__rotate__" in control
+        if force_rotate or self._active_size() > self.max_bytes:
+            path = self._rotate_active()
+            if force_rotate:
+                control["__result__"]["path"] = path
+        if control is not None:
+            (control.get("__flush__") or control.get("__rotate__")).set()
+
+    def _active_size(self) -> int:
+        try:
+            return os.path.getsize(self.active_path)
+        except OSError:
+            return 0
+
+    def _rotate_active(self) -> Optional[str]:
+        if not self._active_size():
+            return None
+        return _close_segment(self.directory, self.active_path)
+
+
+def _close_segment(directory: str, active_path: str) -> str:
+    """Rename an active segment to a closed, compactable one"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(directory, f"events-{stamp}-{uuid.uuid4().hex[:8]}.jsonl")
+    os.replace(active_path, path)
+    return path
+
+
+def _pid_running(pid: int) -> bool:
+    """True if a process with this id exists"""
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION; os.kill(pid, 0) would terminate it on Windows
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def adopt_orphaned_segments(directory: str) -> List[str]:
+    """Close active segments whose writer process is no longer running"""
+    adopted = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return adopted
+    for name in names:
+        match = ACTIVE_PATTERN.match(name)
+        if not match or int(match.group(1)) == os.getpid() or _pid_running(int(match.group(1))):
+            continue
+        try:
+            adopted.append(_close_segment(directory, os.path.join(directory, name)))
+        except OSError as e:
+            logging.error(f"Error adopting event log segment {name}: {str(e)}")
+    return adopted
+
+
+def compact_event_logs(directory: str = "logs/events", output_dir: str = "analytics/events",
+                       delete_processed: bool = True) -> Optional[str]:
+    """
+    Convert closed JSONL segments into a single Parquet file.
+
+    Active segments of processes that are no longer running are closed first.
+
+    Args:
+        directory (str): Event log directory
+        output_dir (str): Directory for the columnar output
+        delete_processed (bool): Remove segments once they have been written;
+            unreadable segments are never deleted but renamed with a
+            ``.corrupt`` suffix so they can be inspected
+
+    Returns:
+        Optional[str]: Path of the Parquet file, or None if there was nothing to compact
+
+    Raises:
+        ImportError: If no Parquet engine (pyarrow) is installed
+    """
+    import pandas as pd
+
+    adopt_orphaned_segments(directory)
+    segments = sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)))
+    if not segments:
+        return None
+
+    frames = []
+    processed = []
+    for segment in segments:
+        try:
+            frames.append(pd.read_json(segment, lines=True, convert_dates=False))
+        except ValueError as e:
+            logging.error(f"Quarantining unreadable event segment {segment}: {str(e)}")
+            os.replace(segment, segment + CORRUPT_SUFFIX)
+            continue
+        processed.append(segment)
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return None
+
+    df = pd.concat(frames, ignore_index=True)
+    df["ts"] = pd.to_datetime(df["ts"], utc=True, format="ISO8601")
+    # Nested values (e.g. agent lists) are stored as JSON text to keep columns flat
+    for column in df.columns:
+        if df[column].map(lambda v: isinstance(v, (list, dict))).any():
+            df[column] = df[column].map(
+                lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v
+            )
+
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    output = os.path.join(output_dir, f"events-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+    df.to_parquet(output, index=False)
+
+    if delete_processed:
+        for segment in processed:
+            os.remove(segment)
+    return output
+
+
+_event_log: Optional[EventLog] = None
+_event_log_lock = threading.Lock()
+
+
+class _NullEventLog:
+    """Stand-in used when EVENT_LOG_ENABLED is false"""
+
+    def log(self, kind: str, **fields: Any) -> None:
+        pass
+
+
+def get_event_log() -> Any:
+    """Return the process-wide event log, created from the environment on first use"""
+    global _event_log
+    with _event_log_lock:
+        if _event_log is None:
+            if os.getenv("EVENT_LOG_ENABLED", "true").lower() in ("0", "false", "no"):
+                return _NullEventLog()
+            _event_log = EventLog(os.getenv("EVENT_LOG_DIR", os.path.join("logs", "events")))
+        return _event_log
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event log maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    compact = subcommands.add_parser("compact", help="Convert closed segments to Parquet")
+    compact.add_argument("--log-dir", default=os.getenv("EVENT_LOG_DIR", os.path.join("logs", "events")))
+    compact.add_argument("--output", default=os.path.join("analytics", "events"))
+    compact.add_argument("--keep", action="store_true", help="Keep segments after compaction")
+    args = parser.parse_args()
+
+    output = compact_event_logs(args.log_dir, args.output, delete_processed=not args.keep)
+    print(output or "No closed segments to compact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#-------------------------------------------------------------------------------------#
+# File: llm_router.py
+# Description: Multi-model routing, failover and latency tracking for the Groq LLM layer
+# Author: @hams_ollo
+#
+# This module manages:
+# - Choosing a small fast model for simple turns and a large one for complex turns
+# - Rolling per-model latency and error-rate tracking
+# - Automatic failover with a cool-down for models that keep failing
+# - Per-model token, cost and latency statistics
+# - A fake backend so routing can be exercised without network access
+#
+# Environment:
+#   GROQ_MODEL           -> primary large model
+#   GROQ_SMALL_MODEL     -> small fast model for simple turns
+#   GROQ_FALLBACK_MODELS -> comma-separated extra models tried when others fail
+#-------------------------------------------------------------------------------------#
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+SMALL = "small"
+LARGE = "large"
+
+DEFAULT_LARGE_MODEL = "llama3-groq-70b-8192-tool-use-preview"
+DEFAULT_SMALL_MODEL = "llama-3.1-8b-instant"
+
+# USD per 1M input/output tokens; unknown models are tracked with zero cost
+MODEL_PRICING = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama3-8b-8192": (0.05, 0.08),
+    "llama3-70b-8192": (0.59, 0.79),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama3-groq-70b-8192-tool-use-preview": (0.89, 0.89),
+}
+
+# Rough characters-per-token ratio, used when a stream reports no usage
+CHARS_PER_TOKEN = 4
+
+COMPLEX_KEYWORDS = (
+    "analyze", "analyse", "compare", "explain", "step by step", "plan", "design",
+    "write", "draft", "code", "debug", "summarize", "summarise", "schedule", "why",
+)
+
+
+@dataclass
+class ModelSpec:
+    """A model the router may use"""
+    name: str
+    tier: str
+    input_cost_per_m: float = 0.0
+    output_cost_per_m: float = 0.0
+
+
+@dataclass
+class CompletionResult:
+    """Text and accounting for a single routed completion"""
+    text: str
+    model: str
+    latency: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: List[str] = field(default_factory=list)
+
+
+class ModelStats:
+    """Rolling latency and error window for one model"""
+
+    def __init__(self, window: int = 50):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.stream_chunks = 0
+        self.cost = 0.0
+        self.unavailable_until = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((latency, ok))
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))]
+
+
+class GroqBackend:
+    """Backend that sends completions through a Groq client"""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def complete(self, model: str, messages: List[Dict[str, str]],
+                 **kwargs: Any) -> Tuple[str, int, int]:
+        completion = self.client.chat.completions.create(messages=messages, model=model, **kwargs)
+        usage = getattr(completion, "usage", None)
+        return (
+            completion.choices[0].message.content,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    def stream(self, model: str, messages: List[Dict[str, str]],
+               usage: Optional[Dict[str, int]] = None, **kwargs: Any) -> Iterator[str]:
+        """Yield text deltas; token usage from the final chunk is written to ``usage``"""
+        chunks = self.client.chat.completions.create(
+            messages=messages, model=model, stream=True, **kwargs
+        )
+        for chunk in chunks:
+            # Groq reports usage on the last chunk under x_groq (or usage with include_usage)
+            chunk_usage = getattr(chunk, "usage", None) or getattr(
+                getattr(chunk, "x_groq", None), "usage", None
+            )
+            if chunk_usage is not None and usage is not None:
+                usage["prompt_tokens"] = getattr(chunk_usage, "prompt_tokens", 0) or 0
+                usage["completion_tokens"] = getattr(chunk_usage, "completion_tokens", 0) or 0
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class FakeBackend:
+    """
+    Local stand-in for GroqBackend.
+
+    ``latencies`` maps model names to ``(mean, jitter)`` seconds and
+    ``failure_rates`` to the probability of raising; ``reply`` builds the
+    response text. Useful for tests and load simulations.
+    """
+
+    def __init__(self, latencies: Optional[Dict[str, Tuple[float, float]]] = None,
+                 failure_rates: Optional[Dict[str, float]] = None,
+                 reply: Optional[Callable[[str, List[Dict[str, str]]], str]] = None,
+                 seed: Optional[int] = None, sleep: Callable[[float], None] = time.sleep):
+        self.latencies = latencies or {}
+        self.failure_rates = failure_rates or {}
+        self.reply = reply or (lambda model, messages: f"[{model}] {messages[-1]['content']}")
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate(self, model: str) -> None:
+        mean, jitter = self.latencies.get(model, (0.0, 0.0))
+        with self._lock:
+            delay = max(0.0, self._random.gauss(mean, jitter)) if jitter else mean
+            failed = self._random.random() < self.failure_rates.get(model, 0.0)
+        if delay:
+            self.sleep(delay)
+        if failed:
+            raise RuntimeError(f"Simulated failure from {model}")
+
+    def complete(self, model: str, messages: List[Dict[str, str]],
+                 **kwargs: Any) -> Tuple[str, int, int]:
+        self._simulate(model)
+        text = self.reply(model, messages)
+        prompt_tokens = sum(len(m["content"].split()) for m in messages)
+        return text, prompt_tokens, len(text.split())
+
+    def stream(self, model: str, messages: List[Dict[str, str]],
+               usage: Optional[Dict[str, int]] = None, **kwargs: Any) -> Iterator[str]:
+        text, prompt_tokens, completion_tokens = self.complete(model, messages, **kwargs)
+        for word in text.split(" "):
+            yield word + " "
+        if usage is not None:
+            usage.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def estimate_tokens(chars: int) -> int:
+    """Approximate token count for text of ``chars`` characters whose usage was not reported"""
+    return -(-chars // CHARS_PER_TOKEN)
+
+
+def classify_complexity(messages: List[Dict[str, str]], long_message_chars: int = 400) -> str:
+    """Heuristically decide whether a turn needs the large model"""
+    last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    lowered = last.lower()
+    if len(last) > long_message_chars or "```" in last:
+        return LARGE
+    if any(re.search(rf"\b{re.escape(keyword)}\b", lowered) for keyword in COMPLEX_KEYWORDS):
+        return LARGE
+    if lowered.count("?") > 1 or lowered.count("\n") > 3:
+        return LARGE
+    return SMALL
+
+
+class ModelRouter:
+    """
+    Routes completions across models by turn complexity and model health.
+
+    Models of the preferred tier are tried first, ordered by recent error rate
+    and median latency, followed by the other tier as a fallback. A model whose
+    rolling error rate exceeds ``error_threshold`` is skipped for ``cooldown``
+    seconds (unless every model is cooling down).
+    """
+
+    def __init__(self, models: List[ModelSpec], backend: Any, window: int = 50,
+                 error_threshold: float = 0.5, min_samples: int = 5, cooldown: float = 30.0,
+                 classifier: Callable[[List[Dict[str, str]]], str] = classify_complexity):
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.models = {spec.name: spec for spec in models}
+        self.backend = backend
+        self.error_threshold = error_threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.classifier = classifier
+        self._stats = {spec.name: ModelStats(window) for spec in models}
+        self._lock = threading.Lock()
+
+    def candidates(self, tier: str, now: Optional[float] = None) -> List[str]:
+        """Return model names in the order they should be tried for a tier"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            def score(name: str) -> Tuple[int, float, float]:
+                stats = self._stats[name]
+                p50 = stats.latency_percentile(50)
+                return (self.models[name].tier != tier, stats.error_rate,
+                        p50 if p50 is not None else 0.0)
+
+            ordered = sorted(self.models, key=score)
+            healthy = [name for name in ordered if self._stats[name].unavailable_until <= now]
+        return healthy or ordered
+
+    def _record(self, name: str, latency: float, ok: bool, prompt_tokens: int = 0,
+                completion_tokens: int = 0, stream_chunks: int = 0) -> None:
+        spec = self.models[name]
+        with self._lock:
+            stats = self._stats[name]
+            stats.record(latency, ok)
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.stream_chunks += stream_chunks
+            stats.cost += (prompt_tokens * spec.input_cost_per_m
+                           + completion_tokens * spec.output_cost_per_m) / 1_000_000
+            if (not ok and len(stats.samples) >= self.min_samples
+                    and stats.error_rate > self.error_threshold):
+                stats.unavailable_until = time.monotonic() + self.cooldown
+                logging.warning(f"Model {name} error rate {stats.error_rate:.0%}, "
+                                f"cooling down for {self.cooldown:.0f}s")
+
+    def complete(self, messages: List[Dict[str, str]], tier: Optional[str] = None,
+                 **kwargs: Any) -> CompletionResult:
+        """
+        Run a completion on the best available model, failing over on errors.
+
+        Raises:
+            RuntimeError: If every model failed; the last error is chained
+        """
+        tier = tier or self.classifier(messages)
+        attempts: List[str] = []
+        last_error: Optional[Exception] = None
+        for name in self.candidates(tier):
+            attempts.append(name)
+            started = time.perf_counter()
+            try:
+                text, prompt_tokens, completion_tokens = self.backend.complete(name, messages, **kwargs)
+            except Exception as e:
+                self._record(name, time.perf_counter() - started, False)
+                logging.error(f"Model {name} failed, trying next: {str(e)}")
+                last_error = e
+                continue
+            latency = time.perf_counter() - started
+            self._record(name, latency, True, prompt_tokens, completion_tokens)
+            return CompletionResult(text, name, latency, prompt_tokens, completion_tokens, attempts)
+        raise RuntimeError(f"All models failed: {', '.join(attempts)}") from last_error
+
+    def stream(self, messages: List[Dict[str, str]], tier: Optional[str] = None,
+               **kwargs: Any) -> Iterator[str]:
+        """
+        Stream a completion, failing over only until the first chunk arrives.
+
+        Once text has been yielded a failure is re-raised, since the caller has
+        already shown part of the answer. Token counts come from the usage the
+        backend reports for the stream, or are estimated from the text if none is.
+        """
+        tier = tier or self.classifier(messages)
+        attempts: List[str] = []
+        last_error: Optional[Exception] = None
+        for name in self.candidates(tier):
+            attempts.append(name)
+            started = time.perf_counter()
+            produced = 0
+            chars = 0
+            usage: Dict[str, int] = {}
+            try:
+                for chunk in self.backend.stream(name, messages, usage=usage, **kwargs):
+                    produced += 1
+                    chars += len(chunk)
+                    yield chunk
+            except Exception as e:
+                self._record(name, time.perf_counter() - started, False, stream_chunks=produced)
+                if produced:
+                    raise
+                logging.error(f"Model {name} failed, trying next: {str(e)}")
+                last_error = e
+                continue
+            prompt_tokens = usage.get("prompt_tokens") or estimate_tokens(
+                sum(len(m["content"]) for m in messages)
+            )
+            completion_tokens = usage.get("completion_tokens") or estimate_tokens(chars)
+            self._record(name, time.perf_counter() - started, True,
+                         prompt_tokens, completion_tokens, produced)
+            return
+        raise RuntimeError(f"All models failed: {', '.join(attempts)}") from last_error
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model request, error, latency, token and cost statistics"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "tier": self.models[name].tier,
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "error_rate": stats.error_rate,
+                    "latency_p50": stats.latency_percentile(50),
+                    "latency_p95": stats.latency_percentile(95),
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "stream_chunks": stats.stream_chunks,
+                    "cost_usd": round(stats.cost, 6),
+                    "available": stats.unavailable_until <= now,
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+def model_spec(name: str, tier: str) -> ModelSpec:
+    """Build a ModelSpec using known pricing when available"""
+    input_cost, output_cost = MODEL_PRICING.get(name, (0.0, 0.0))
+    return ModelSpec(name, tier, input_cost, output_cost)
+
+
+def models_from_env() -> List[ModelSpec]:
+    """Build the model list from GROQ_MODEL, GROQ_SMALL_MODEL and GROQ_FALLBACK_MODELS"""
+    large = os.getenv("GROQ_MODEL", DEFAULT_LARGE_MODEL)
+    small = os.getenv("GROQ_SMALL_MODEL", DEFAULT_SMALL_MODEL)
+    specs = [model_spec(large, LARGE)]
+    if small and small != large:
+        specs.append(model_spec(small, SMALL))
+    for name in filter(None, (n.strip() for n in os.getenv("GROQ_FALLBACK_MODELS", "").split(","))):
+        if name not in (spec.name for spec in specs):
+            specs.append(model_spec(name, LARGE))
+    return specs
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router(client: Any) -> ModelRouter:
+    """Return the process-wide router for a Groq client, creating it on first use"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(models_from_env(), GroqBackend(client))
+        return _router
@@ -1,9 +1,96 @@
+import io
 import os
-from typing import Optional
+import subprocess
+import wave
+from typing import BinaryIO, Iterator, Optional, Union
+import numpy as np
 import whisper
 from elevenlabs import generate, save, set_api_key
 from google.cloud import texttospeech
 
+# Whisper models expect 16 kHz mono float32 audio
+WHISPER_SAMPLE_RATE = 16000
+AUDIO_CHUNK_SIZE = 16 * 1024
+
+AudioInput = Union[bytes, bytearray, memoryview, BinaryIO, np.ndarray]
+
+def decode_audio(audio: AudioInput, sample_rate: Optional[int] = None) -> np.ndarray:
+    """
+    Decode in-memory audio into the 16 kHz mono float32 array Whisper expects.
+
+    Args:
+        audio (AudioInput): Encoded audio bytes or file-like object, or a numpy
+            array of samples
+        sample_rate (Optional[int]): Sample rate of a numpy array input
+            (defaults to 16 kHz)
+
+    Returns:
+        np.ndarray: Mono float32 samples in [-1, 1] at 16 kHz
+    """
+    if isinstance(audio, np.ndarray):
+        if np.issubdtype(audio.dtype, np.integer):
+            info = np.iinfo(audio.dtype)
+            scale = (int(info.max) + 1) / (2 if info.min == 0 else 1)
+            offset = scale if info.min == 0 else 0.0
+            samples = ((audio.astype(np.float32) - offset) / scale).astype(np.float32)
+        else:
+            samples = audio.astype(np.float32, copy=False)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        return _resample(samples, sample_rate or WHISPER_SAMPLE_RATE)
+
+    data = audio.read() if hasattr(audio, "read") else bytes(audio)
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            return _decode_wav(data)
+        except (wave.Error, ValueError):
+            pass  # Compressed or unusual WAV variants fall through to ffmpeg
+    return _decode_with_ffmpeg(data)
+
+def _decode_wav(data: bytes) -> np.ndarray:
+    """Decode PCM WAV bytes without spawning ffmpeg"""
+    with wave.open(io.BytesIO(data)) as wav:
+        width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return _resample(samples, rate)
+
+def _decode_with_ffmpeg(data: bytes) -> np.ndarray:
+    """Decode any ffmpeg-supported format through pipes instead of temp files"""
+    process = subprocess.run(
+        ["ffmpeg", "-nostdin", "-threads", "0", "-i", "pipe:0",
+         "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+         "-ar", str(WHISPER_SAMPLE_RATE), "pipe:1"],
+        input=data, capture_output=True, check=True
+    )
+    return np.frombuffer(process.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+def _resample(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Linearly resample to 16 kHz (sufficient for speech recognition)"""
+    if rate == WHISPER_SAMPLE_RATE or samples.size == 0:
+        return samples
+    duration = samples.size / rate
+    target = np.linspace(0, duration, int(duration * WHISPER_SAMPLE_RATE), endpoint=False)
+    source = np.arange(samples.size) / rate
+    return np.interp(target, source, samples).astype(np.float32)
+
+def iter_chunks(data: bytes, chunk_size: int = AUDIO_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield ``chunk_size`` slices of a bytes object"""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size].tobytes()
+
 class VoiceUtils:
     def __init__(self, elevenlabs_api_key: Optional[str] = None, google_credentials_path: Optional[str] = None):
         """Initialize voice utilities with optional API keys"""
@@ -11,12 +98,14 @@ class VoiceUtils:
             set_api_key(elevenlabs_api_key)
         if google_credentials_path:
             os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = google_credentials_path
-        
+
         self.whisper_model = whisper.load_model("base")
         self.google_client = texttospeech.TextToSpeechClient()
 
-    def transcribe_audio(self, audio_file_path: str) -> str:
-        """Transcribe audio file using Whisper"""
+    def transcribe_audio(self, audio_file_path: Union[str, AudioInput]) -> str:
+        """Transcribe an audio file path, or in-memory audio, using Whisper"""
+        if not isinstance(audio_file_path, str):
+            return self.transcribe_buffer(audio_file_path)
         try:
             result = self.whisper_model.transcribe(audio_file_path)
             return result["text"]
@@ -24,6 +113,26 @@ class VoiceUtils:
             print(f"Error transcribing audio: {str(e)}")
             return ""
 
+    def transcribe_buffer(self, audio: AudioInput, sample_rate: Optional[int] = None) -> str:
+        """Transcribe in-memory audio (bytes, BytesIO or numpy samples) using Whisper"""
+        try:
+            samples = decode_audio(audio, sample_rate)
+            result = self.whisper_model.transcribe(samples)
+            return result["text"]
+        except Exception as e:
+            print(f"Error transcribing audio: {str(e)}")
+            return ""
+
+    def stream_elevenlabs_speech(self, text: str, voice_id: str) -> Iterator[bytes]:
+        """Generate speech using ElevenLabs, yielding MP3 chunks as they arrive"""
+        audio = generate(text=text, voice=voice_id, stream=True)
+        if isinstance(audio, (bytes, bytearray)):
+            yield from iter_chunks(bytes(audio))
+        else:
+            for chunk in audio:
+                if chunk:
+                    yield chunk
+
     def generate_elevenlabs_speech(self, text: str, voice_id: str, output_path: str) -> bool:
         """Generate speech using ElevenLabs"""
         try:
@@ -34,26 +143,34 @@ class VoiceUtils:
             print(f"Error generating ElevenLabs speech: {str(e)}")
             return False
 
+    def synthesize_google_speech(self, text: str, language_code: str) -> bytes:
+        """Generate speech using Google Text-to-Speech and return the MP3 bytes"""
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+        voice = texttospeech.VoiceSelectionParams(
+            language_code=language_code,
+            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
+        )
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3
+        )
+
+        response = self.google_client.synthesize_speech(
+            input=synthesis_input,
+            voice=voice,
+            audio_config=audio_config
+        )
+        return response.audio_content
+
+    def stream_google_speech(self, text: str, language_code: str) -> Iterator[bytes]:
+        """Generate speech using Google Text-to-Speech, yielding MP3 chunks"""
+        yield from iter_chunks(self.synthesize_google_speech(text, language_code))
+
     def generate_google_speech(self, text: str, language_code: str, output_path: str) -> bool:
         """Generate speech using Google Text-to-Speech"""
         try:
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            voice = texttospeech.VoiceSelectionParams(
-                language_code=language_code,
-                ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-            )
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
-            )
-
-            response = self.google_client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
-            )
-
+            audio_content = self.synthesize_google_speech(text, language_code)
             with open(output_path, "wb") as out:
-                out.write(response.audio_content)
+                out.write(audio_content)
             return True
         except Exception as e:
             print(f"Error generating Google speech: {str(e)}")
@@ -26,12 +26,46 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Initialize session state
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
 if 'chat_agent' not in st.session_state:
     st.session_state.chat_agent = ChatAgent()
+# The agent's compact Conversation is the single copy of the chat shown here
+st.session_state.messages = st.session_state.chat_agent.conversation_history
 if 'show_settings' not in st.session_state:
     st.session_state.show_settings = False
+if 'crew_jobs' not in st.session_state:
+    st.session_state.crew_jobs = []
+if 'voice_mode' not in st.session_state:
+    st.session_state.voice_mode = False
+if 'last_audio_id' not in st.session_state:
+    st.session_state.last_audio_id = None
+
+@st.cache_resource
+def get_voice_utils():
+    """Load the Whisper model and TTS client once per process, shared by all sessions"""
+    from app.utils.voice_utils import VoiceUtils
+    return VoiceUtils()
+
+def audio_input(label):
+    """Microphone recorder when this Streamlit version has one, file upload otherwise"""
+    recorder = getattr(st, "audio_input", None) or getattr(st, "experimental_audio_input", None)
+    if recorder:
+        return recorder(label)
+    return st.file_uploader(label, type=["wav", "mp3", "m4a", "ogg", "webm"])
+
+def collect_crew_results():
+    """Append finished background crew results to the chat as follow-up messages"""
+    still_running = []
+    for job_id in st.session_state.crew_jobs:
+        job = st.session_state.chat_agent.get_crew_result(job_id)
+        if job["status"] == "done":
+            st.session_state.messages.append(
+                "assistant", f"Additional insights from the crew:\n{job['result']}"
+            )
+        elif job["status"] == "failed":
+            logger.error(f"Crew job {job_id} failed: {job['error']}")
+        elif job["status"] in ("pending", "running"):
+            still_running.append(job_id)
+    st.session_state.crew_jobs = still_running
 
 # Streamlit UI
 st.title("🪶 hams_ollo & AI 🤖")
@@ -42,24 +76,30 @@ with st.sidebar:
     if st.button("Toggle Settings"):
         st.session_state.show_settings = not st.session_state.show_settings
     
+    st.session_state.voice_mode = st.toggle("Voice mode", value=st.session_state.voice_mode)
+    
     if st.session_state.show_settings:
         st.write("Chat Settings")
         temperature = st.slider("Temperature", 0.0, 1.0, 0.7, 0.1)
         max_tokens = st.slider("Max Tokens", 1000, 8192, 4096, 100)
         
         if st.button("Clear Chat History"):
-            st.session_state.messages = []
-            st.session_state.chat_agent.conversation_history = []
+            st.session_state.messages.clear()
+            st.session_state.chat_agent.cancel_crew_jobs()
+            st.session_state.crew_jobs = []
             st.experimental_rerun()
 
 # Main chat interface
 st.subheader("Your AI Assistant")
 
+# Pick up crew results that finished since the last rerun
+collect_crew_results()
+
 # Display chat messages
 for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-        if message["role"] == "assistant":
+    with st.chat_message(message.role):
+        st.markdown(message.content)
+        if message.role == "assistant":
             message_container = st.container()
             with message_container:
                 col1, col2 = st.columns([0.1, 0.9])
@@ -72,10 +112,30 @@ for message in st.session_state.messages:
                         if feedback:
                             st.toast("Thanks for your feedback!")
 
+if st.session_state.crew_jobs:
+    st.info("The crew is still working on your last request; its insights will appear here.")
+    st.button("Check for crew updates")  # Clicking reruns the script and collects results
+
 # Chat input
-if prompt := st.chat_input("What's on your mind?"):
-    # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+prompt = st.chat_input("What's on your mind?")
+
+# Voice input: the recording stays in memory from upload to transcript
+if st.session_state.voice_mode:
+    recording = audio_input("Speak to your assistant")
+    audio_id = getattr(recording, "file_id", None) or (recording and hash(recording.getvalue()))
+    if recording is not None and audio_id != st.session_state.last_audio_id:
+        st.session_state.last_audio_id = audio_id
+        try:
+            with st.spinner("Transcribing..."):
+                prompt = get_voice_utils().transcribe_buffer(recording.getvalue()).strip() or prompt
+        except Exception as e:
+            logger.error(f"Error transcribing voice input: {str(e)}")
+            st.error("Sorry, I couldn't understand that recording. Please try again.")
+
+if prompt:
+    # A new message supersedes crew work that is still running
+    st.session_state.crew_jobs = []
+    # The agent records the user message in the shared conversation
     with st.chat_message("user"):
         st.markdown(prompt)
 
@@ -85,12 +145,15 @@ if prompt := st.chat_input("What's on your mind?"):
             try:
                 response = st.session_state.chat_agent.process_message(prompt)
                 if response["success"]:
+                    if response.get("crew_job_id"):
+                        st.session_state.crew_jobs.append(response["crew_job_id"])
                     st.markdown(response["response"])
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": response["response"]
-                    })
-                    
+                    if st.session_state.voice_mode:
+                        try:
+                            speech = get_voice_utils().stream_google_speech(response["response"], "en-US")
+                            st.audio(b"".join(speech), format="audio/mp3")
+                        except Exception as e:
+                            logger.error(f"Error synthesizing voice response: {str(e)}")
                     # Add feedback buttons
                     message_container = st.container()
                     with message_container:
@@ -93,6 +93,17 @@ def start_streamlit():
         logger.error(f"Failed to start Streamlit: {str(e)}")
         return None
 
+def start_api_server():
+    """Start the headless HTTP/JSON API server if ENABLE_API is set"""
+    if os.getenv('ENABLE_API', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    try:
+        logger.info("Starting API server...")
+        return subprocess.Popen([sys.executable, '-m', 'app.server'])
+    except Exception as e:
+        logger.error(f"Failed to start API server: {str(e)}")
+        return None
+
 def main():
     """Main application entry point"""
     logger.info("Starting AI Assistant application...")
@@ -108,6 +119,9 @@ def main():
         logger.error("Failed to start Streamlit. Exiting...")
         sys.exit(1)
     
+    # Optionally start the API server alongside Streamlit
+    api_process = start_api_server()
+    
     try:
         # Keep the main process running
         while True:
@@ -128,6 +142,9 @@ def main():
         if streamlit_process:
             streamlit_process.terminate()
             streamlit_process.wait()
+        if api_process:
+            api_process.terminate()
+            api_process.wait()
     
     logger.info("Application shutdown complete")
 
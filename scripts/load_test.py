@@ -0,0 +1,226 @@
+#-------------------------------------------------------------------------------------#
+# File: load_test.py
+# Description: Load-test harness simulating many concurrent Streamlit chat sessions
+# Author: @hams_ollo
+#
+# Each simulated session does what one Streamlit session does, without the frontend:
+# - Constructs its own ChatAgent (as frontend/streamlit.py does per session)
+# - Sends chat turns with a think time between them
+# - Persists every turn through DatabaseUtils (one SQLite connection per call)
+#
+# The Groq backend is replaced by the model router's FakeBackend with configurable
+# latency, so no API key or network access is needed and results are repeatable.
+# Prompts avoid the scheduling/content keywords, so no crew runs are started.
+#
+# Usage:
+#   python scripts/load_test.py --sessions 50 --turns 10
+#   python scripts/load_test.py --sessions 200 --latency 0.8 --jitter 0.3 --json report.json
+#-------------------------------------------------------------------------------------#
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# groq.Groq refuses to start without a key, even though the fake backend never uses it
+os.environ.setdefault("GROQ_API_KEY", "load-test")
+# Simulated traffic must not end up in the real logs/events analytics
+os.environ.setdefault("EVENT_LOG_ENABLED", "false")
+
+from app.agents.chat_agent import ChatAgent
+from app.utils.db_utils import DatabaseUtils
+from app.utils.llm_router import FakeBackend, ModelRouter, models_from_env
+
+PROMPTS = [
+    "hi, how are you today?",
+    "What is the capital of Portugal?",
+    "Can you explain how a hash map works?",
+    "thanks, that helps",
+    "Compare Python lists and tuples for me",
+    "Tell me a fun fact about octopuses",
+    "How do I reverse a string in Python?",
+    "What's a good name for a golden retriever?",
+]
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable, 0 on Windows)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+class LoadTest:
+    """Runs simulated sessions and collects latency, throughput, memory and DB metrics"""
+
+    def __init__(self, sessions: int, turns: int, latency: float, jitter: float,
+                 think_time: float, failure_rate: float, db_path: str, seed: int):
+        self.sessions = sessions
+        self.turns = turns
+        self.think_time = think_time
+        self.db_utils = DatabaseUtils(db_path)
+        models = models_from_env()
+        backend = FakeBackend(
+            latencies={spec.name: (latency, jitter) for spec in models},
+            failure_rates={spec.name: failure_rate for spec in models},
+            seed=seed,
+        )
+        # One router per process, as in production
+        self.router = ModelRouter(models, backend)
+        self._lock = threading.Lock()
+        self.turn_latencies: List[float] = []
+        self.db_latencies: List[float] = []
+        self.errors = 0
+        self.db_failures = 0
+
+    def _session(self, index: int, agent: ChatAgent, start: threading.Event) -> None:
+        rng = random.Random(index)
+        start.wait()
+        for _ in range(self.turns):
+            prompt = rng.choice(PROMPTS)
+            started = time.perf_counter()
+            response = agent.process_message(prompt)
+            turn_latency = time.perf_counter() - started
+
+            db_started = time.perf_counter()
+            row_id = self.db_utils.save_conversation(prompt, response["response"], {"session": index})
+            db_latency = time.perf_counter() - db_started
+
+            with self._lock:
+                self.turn_latencies.append(turn_latency)
+                self.db_latencies.append(db_latency)
+                if not response["success"]:
+                    self.errors += 1
+                if row_id == -1:
+                    self.db_failures += 1
+            if self.think_time:
+                time.sleep(rng.uniform(0, 2 * self.think_time))
+
+    def run(self) -> Dict[str, Any]:
+        rss_start = current_rss_mb()
+        construct_started = time.perf_counter()
+        agents = [ChatAgent(router=self.router) for _ in range(self.sessions)]
+        construct_time = time.perf_counter() - construct_started
+        rss_sessions = current_rss_mb()
+
+        start = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.sessions) as pool:
+            futures = [pool.submit(self._session, i, agent, start) for i, agent in enumerate(agents)]
+            run_started = time.perf_counter()
+            start.set()
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - run_started
+        rss_end = current_rss_mb()
+
+        total_turns = len(self.turn_latencies)
+        return {
+            "sessions": self.sessions,
+            "turns_per_session": self.turns,
+            "total_turns": total_turns,
+            "elapsed_s": elapsed,
+            "throughput_turns_per_s": total_turns / elapsed if elapsed else 0.0,
+            "errors": self.errors,
+            "session_construct_ms": construct_time * 1000 / self.sessions,
+            "latency_ms": {
+                name: (percentile(self.turn_latencies, pct) or 0.0) * 1000
+                for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+            },
+            "sqlite_write_ms": {
+                name: (percentile(self.db_latencies, pct) or 0.0) * 1000
+                for name, pct in (("p50", 50), ("p99", 99), ("max", 100))
+            },
+            # Estimate only: write time above the fastest 10% of writes, summed. The
+            # sqlite3 module does not expose lock waits, so contention is inferred
+            "sqlite_contention_estimate_ms_total": sum(
+                max(0.0, latency - (percentile(self.db_latencies, 10) or 0.0))
+                for latency in self.db_latencies
+            ) * 1000,
+            "sqlite_failed_writes": self.db_failures,
+            "rss_mb": {"start": rss_start, "after_sessions": rss_sessions, "end": rss_end},
+            "rss_growth_per_session_kb": (rss_sessions - rss_start) * 1024 / self.sessions,
+            "rss_growth_per_turn_kb": (rss_end - rss_sessions) * 1024 / max(1, total_turns),
+            "router": self.router.stats(),
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    db = report["sqlite_write_ms"]
+    rss = report["rss_mb"]
+    print(f"Sessions:            {report['sessions']} x {report['turns_per_session']} turns")
+    print(f"Elapsed:             {report['elapsed_s']:.2f}s")
+    print(f"Throughput:          {report['throughput_turns_per_s']:.1f} turns/s")
+    print(f"Errors:              {report['errors']}")
+    print(f"Turn latency (ms):   p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"SQLite write (ms):   p50 {db['p50']:.2f}  p99 {db['p99']:.2f}  max {db['max']:.2f}")
+    print(f"SQLite contention:   ~{report['sqlite_contention_estimate_ms_total']:.1f}ms total "
+          f"(estimate), "
+          f"{report['sqlite_failed_writes']} failed writes")
+    print(f"Session setup:       {report['session_construct_ms']:.2f}ms per ChatAgent")
+    print(f"RSS (MB):            start {rss['start']:.1f}  after sessions "
+          f"{rss['after_sessions']:.1f}  end {rss['end']:.1f}")
+    print(f"RSS growth:          {report['rss_growth_per_session_kb']:.1f}KB per session, "
+          f"{report['rss_growth_per_turn_kb']:.2f}KB per turn")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate concurrent chat sessions")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions")
+    parser.add_argument("--turns", type=int, default=5, help="Chat turns per session")
+    parser.add_argument("--latency", type=float, default=0.6, help="Mean LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="LLM latency std deviation")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause between a session's turns in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability that a fake LLM call fails")
+    parser.add_argument("--db", help="SQLite file (default: a temporary file)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        load_test = LoadTest(
+            sessions=args.sessions, turns=args.turns, latency=args.latency,
+            jitter=args.jitter, think_time=args.think_time,
+            failure_rate=args.failure_rate,
+            db_path=args.db or os.path.join(tmp, "load_test.db"), seed=args.seed,
+        )
+        report = load_test.run()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Shared fixtures for the test suite."""
+import importlib
+import sys
+import types
+
+import pytest
+
+# Optional speech dependencies imported at module level by app.utils.voice_utils
+VOICE_MODULES = {
+    "whisper": {"load_model": lambda *args, **kwargs: None},
+    "elevenlabs": {"generate": None, "save": None, "set_api_key": None},
+    "google.cloud.texttospeech": {"TextToSpeechClient": lambda *args, **kwargs: None},
+}
+
+# Modules that import the speech dependencies and must be re-imported per test
+VOICE_IMPORTERS = ("app.utils.voice_utils", "app.crew")
+
+
+@pytest.fixture
+def voice_stubs(monkeypatch):
+    """Stub speech dependencies that are not installed, for the duration of one test."""
+    for name, attrs in VOICE_MODULES.items():
+        try:
+            importlib.import_module(name)
+            continue
+        except ImportError:
+            pass
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        parent_name, _, child = name.rpartition(".")
+        if parent_name:
+            try:
+                parent = importlib.import_module(parent_name)
+            except ImportError:
+                parent = types.ModuleType(parent_name)
+                parent.__path__ = []
+                monkeypatch.setitem(sys.modules, parent_name, parent)
+            monkeypatch.setattr(parent, child, module, raising=False)
+        monkeypatch.setitem(sys.modules, name, module)
+    for name in VOICE_IMPORTERS:
+        sys.modules.pop(name, None)
+    yield
+    # Drop modules bound to the stubs so later tests import them afresh
+    for name in VOICE_IMPORTERS:
+        sys.modules.pop(name, None)
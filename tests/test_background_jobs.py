@@ -0,0 +1,103 @@
+"""Tests for the background job runner used for crew runs."""
+import threading
+
+from app.utils.background_jobs import CANCELLED, DONE, FAILED, BackgroundJobs
+
+
+def test_result_is_polled_once_and_callback_fires() -> None:
+    jobs = BackgroundJobs(max_workers=1)
+    delivered = threading.Event()
+    seen = {}
+
+    def on_done(job_id, status):
+        seen.update(status)
+        delivered.set()
+
+    job_id = jobs.submit(lambda: "crew insight", on_done)
+    assert delivered.wait(5)
+    assert seen["status"] == DONE and seen["result"] == "crew insight"
+    assert jobs.pop(job_id)["result"] == "crew insight"
+    assert jobs.status(job_id)["status"] is None
+
+
+def test_failures_are_reported() -> None:
+    jobs = BackgroundJobs(max_workers=1)
+    done = threading.Event()
+
+    def boom():
+        raise ValueError("crew failed")
+
+    job_id = jobs.submit(boom, lambda *_: done.set())
+    assert done.wait(5)
+    status = jobs.status(job_id)
+    assert status["status"] == FAILED and status["error"] == "crew failed"
+
+
+def test_cancel_running_job_discards_result() -> None:
+    jobs = BackgroundJobs(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    callbacks = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    running = jobs.submit(slow, lambda *args: callbacks.append(args))
+    queued = jobs.submit(lambda: "never", lambda *args: callbacks.append(args))
+    assert started.wait(5)
+    assert jobs.cancel(running) and jobs.cancel(queued)
+    release.set()
+    jobs.join(5)
+
+    assert jobs.status(running)["status"] == CANCELLED
+    assert jobs.status(queued)["status"] == CANCELLED
+    assert callbacks == []
+    assert not jobs.cancel(running)
+
+
+def test_cancelled_running_job_frees_its_slot() -> None:
+    jobs = BackgroundJobs(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    finished = threading.Event()
+    seen_cancel = []
+
+    def cooperative(cancelled):
+        started.set()
+        release.wait(5)
+        seen_cancel.append(cancelled.is_set())
+        return "late"
+
+    running = jobs.submit(cooperative, with_cancel_event=True)
+    assert started.wait(5)
+    queued = jobs.submit(lambda: "next", lambda *_: finished.set())
+    assert jobs.cancel(running)
+    # The queued job runs while the cancelled one is still winding down
+    assert finished.wait(5)
+    assert jobs.status(queued)["result"] == "next"
+    release.set()
+    jobs.join(5)
+    assert seen_cancel == [True] and jobs.active == 0
+
+
+def test_shared_agent_does_not_track_client_crew_jobs(monkeypatch) -> None:
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setenv("EVENT_LOG_ENABLED", "false")
+    from app.agents import chat_agent
+    from app.utils.llm_router import FakeBackend, ModelRouter, models_from_env
+
+    class FakeCrew:
+        def __init__(self, **kwargs):
+            self.agents = kwargs.get("agents", [])
+
+        def kickoff(self):
+            return "crew insight"
+
+    monkeypatch.setattr(chat_agent, "Crew", FakeCrew)
+    agent = chat_agent.ChatAgent(router=ModelRouter(models_from_env(), FakeBackend()),
+                                 background_jobs=BackgroundJobs(max_workers=1))
+
+    shared = agent.process_message("schedule a meeting", {"history": []})
+    assert shared["crew_job_id"] and agent._crew_jobs == []
+    owned = agent.process_message("schedule a meeting")
+    assert agent._crew_jobs == [owned["crew_job_id"]]
@@ -0,0 +1,156 @@
+"""Tests for the local calendar engine."""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.calendar_utils import (
+    CalendarStore,
+    IntervalIndex,
+    free_slots,
+    merge_intervals,
+    parse_ics,
+)
+from app.utils.db_utils import DatabaseUtils
+
+MONDAY = datetime(2024, 3, 18, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path) -> CalendarStore:
+    """Fixture providing a calendar store backed by a temporary database."""
+    return CalendarStore(DatabaseUtils(str(tmp_path / "calendar.db")))
+
+
+class TestIntervalIndex:
+    """Overlap queries must match a brute-force scan."""
+
+    def test_matches_brute_force(self) -> None:
+        rng = random.Random(7)
+        intervals = []
+        for key in range(2000):
+            start = rng.uniform(0, 100000)
+            intervals.append((start, start + rng.uniform(1, 5000), key))
+        index = IntervalIndex(intervals[:1500], buffer_size=64)
+        for item in intervals[1500:]:
+            index.add(*item)
+        for key in range(0, 2000, 3):
+            index.remove(key)
+        live = [item for item in intervals if item[2] % 3 != 0]
+
+        for _ in range(200):
+            start = rng.uniform(0, 100000)
+            end = start + rng.uniform(1, 3000)
+            expected = {key for s, e, key in live if s < end and e > start}
+            assert {key for _, _, key in index.overlapping(start, end)} == expected
+        assert len(index) == len(live)
+
+    def test_bulk_add_rebuilds_once(self) -> None:
+        index = IntervalIndex(buffer_size=64)
+        started = time.perf_counter()
+        index.add_many((i * 600.0, i * 600.0 + 1800, i) for i in range(50000))
+        index.add_many((i * 600.0 + 60, i * 600.0 + 120, i) for i in range(0, 50000, 2))
+        elapsed = time.perf_counter() - started
+
+        assert len(index) == 50000
+        assert index.overlapping(0, 600) == [(60, 120, 0)]
+        assert [key for _, _, key in index.overlapping(1200, 1300)] == [1, 2]
+        assert elapsed < 2.0, f"bulk insert of 50k intervals took {elapsed:.2f}s"
+
+    def test_half_open_boundaries(self) -> None:
+        index = IntervalIndex([(10, 20, "a")])
+        assert index.overlapping(20, 30) == []
+        assert index.overlapping(0, 10) == []
+        assert index.overlapping(19, 21) == [(10, 20, "a")]
+
+    def test_re_adding_key_replaces_interval(self) -> None:
+        index = IntervalIndex([(0, 10, "a")])
+        index.remove("a")
+        index.add(20, 30, "a")
+        assert index.overlapping(0, 100) == [(20, 30, "a")]
+        index.add(0, 10, "a")
+        assert index.overlapping(0, 100) == [(0, 10, "a")]
+        assert len(index) == 1
+
+
+def test_merge_and_free_slots() -> None:
+    assert merge_intervals([(5, 8), (1, 3), (2, 4), (8, 9)]) == [(1, 4), (5, 9)]
+    assert free_slots([(2, 4), (6, 7)], 0, 10, 2) == [(0, 2), (4, 6), (7, 10)]
+    assert free_slots([(2, 4)], 0, 10, 2, step=2) == [(0, 2), (4, 6), (6, 8), (8, 10)]
+
+
+class TestCalendarStore:
+    """Persistence, availability and ICS round trips."""
+
+    def test_common_slots_across_participants(self, store: CalendarStore, tmp_path) -> None:
+        store.add_event("alice", "Standup", MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=10))
+        store.add_event("bob", "Review", MONDAY + timedelta(hours=10), MONDAY + timedelta(hours=12))
+
+        slots = store.find_common_slots(
+            ["alice", "bob"], timedelta(hours=1),
+            MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=14)
+        )
+        assert slots == [((MONDAY + timedelta(hours=12)).timestamp(),
+                          (MONDAY + timedelta(hours=14)).timestamp())]
+
+        reloaded = CalendarStore(DatabaseUtils(str(tmp_path / "calendar.db")))
+        assert len(reloaded.events_between("bob", MONDAY, MONDAY + timedelta(days=1))) == 1
+
+    def test_conflicts_and_removal(self, store: CalendarStore) -> None:
+        a = store.add_event("alice", "A", MONDAY, MONDAY + timedelta(hours=2))
+        store.add_event("alice", "B", MONDAY + timedelta(hours=1), MONDAY + timedelta(hours=3))
+        store.add_event("alice", "C", MONDAY + timedelta(hours=4), MONDAY + timedelta(hours=5))
+
+        conflicts = store.find_conflicts("alice")
+        assert [[e["title"] for e in group] for group in conflicts] == [["A", "B"]]
+
+        assert store.remove_event("alice", a["uid"])
+        assert store.find_conflicts("alice") == []
+
+    def test_update_event_by_uid(self, store: CalendarStore) -> None:
+        store.add_event("alice", "Sync", MONDAY, MONDAY + timedelta(hours=1), uid="u1")
+        store.add_event("alice", "Sync", MONDAY + timedelta(hours=2),
+                        MONDAY + timedelta(hours=3), uid="u1")
+
+        day = (MONDAY, MONDAY + timedelta(days=1))
+        assert [e["uid"] for e in store.events_between("alice", *day)] == ["u1"]
+        assert store.busy_intervals("alice", *day) == [
+            ((MONDAY + timedelta(hours=2)).timestamp(), (MONDAY + timedelta(hours=3)).timestamp())
+        ]
+
+    def test_reimporting_ics_does_not_self_conflict(self, store: CalendarStore) -> None:
+        ics = (
+            "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:X\r\nSUMMARY:X\r\n"
+            "DTSTART:20240318T090000Z\r\nDTEND:20240318T100000Z\r\n"
+            "END:VEVENT\r\nEND:VCALENDAR\r\n"
+        )
+        store.import_ics("alice", ics)
+        store.import_ics("alice", ics)
+        assert store.find_conflicts("alice", MONDAY, MONDAY + timedelta(days=1)) == []
+
+    def test_ics_round_trip(self, store: CalendarStore) -> None:
+        ics = (
+            "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:1@test\r\n"
+            "DTSTART:20240318T090000Z\r\nDURATION:PT1H30M\r\n"
+            "SUMMARY:Plan\\, review\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+        )
+        assert store.import_ics("alice", ics) == 1
+        exported = parse_ics(store.export_ics("alice"))
+        assert exported[0]["uid"] == "1@test"
+        assert exported[0]["title"] == "Plan, review"
+        assert exported[0]["end"] - exported[0]["start"] == timedelta(hours=1, minutes=30)
+
+
+def test_handle_conflicts_reserves_slots_within_working_hours(store: CalendarStore) -> None:
+    from app.agents.scheduling_agent import SchedulingAgent
+
+    for title in ("A", "B", "C"):
+        store.add_event("alice", title, MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=10))
+    agent = SchedulingAgent(calendar=store)
+
+    suggestions = agent.handle_conflicts(store.find_conflicts("alice"))
+    slots = [s["alternative"] for s in suggestions]
+    assert len(slots) == 2 and all(slots)
+    assert slots[0][1] <= slots[1][0]
+    assert all(9 <= start.hour and end.hour <= 17 for start, end in slots)
@@ -0,0 +1,76 @@
+"""Tests for the typed configuration loader."""
+import os
+import shutil
+
+import pytest
+
+from app.config import loader as config_loader
+from app.config.loader import DEFAULT_CONFIG_DIR, ConfigError, ConfigLoader
+
+
+@pytest.fixture
+def config_dir(tmp_path) -> str:
+    """Fixture providing a writable copy of the shipped configuration."""
+    for name in ("agents.yaml", "tasks.yaml"):
+        shutil.copy(os.path.join(DEFAULT_CONFIG_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+
+def _touch_later(path: str) -> None:
+    """Bump a file's mtime so the change is visible regardless of clock resolution."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_shipped_config_is_valid() -> None:
+    config = ConfigLoader().config
+    assert config.agents["scheduling_agent"].role == "Scheduling Assistant"
+    assert config.tasks["schedule_meeting"].agent == "scheduling_agent"
+    assert config.tasks["schedule_meeting"].group == "scheduling_tasks"
+
+
+def test_loaders_share_cached_config(config_dir: str) -> None:
+    assert ConfigLoader(config_dir).config is ConfigLoader(config_dir).config
+
+
+def test_hot_reload_picks_up_changes(config_dir: str) -> None:
+    loader = ConfigLoader(config_dir, check_interval=0)
+    assert not loader.reload_if_changed()
+
+    path = os.path.join(config_dir, "agents.yaml")
+    with open(path) as f:
+        text = f.read()
+    with open(path, "w") as f:
+        f.write(text.replace("Scheduling Assistant", "Calendar Assistant"))
+    _touch_later(path)
+
+    assert loader.reload_if_changed()
+    assert loader.config.agents["scheduling_agent"].role == "Calendar Assistant"
+    assert loader.config.agents["scheduling_agent"].agent_kwargs()["role"] == "Calendar Assistant"
+    # Only the latest version per directory stays cached
+    assert config_loader._app_configs[loader.config_dir] is loader.config
+
+
+@pytest.mark.parametrize("agents_yaml,message", [
+    ("chat_agent:\n  goal: g\n  backstory: b\n", "'role' must be a non-empty string"),
+    ("chat_agent:\n  role: r\n  goal: g\n  backstory: b\n  tools: x\n", "'tools' must be a list"),
+    ("- not a mapping\n", "expected a mapping of agent names"),
+])
+def test_schema_errors_fail_fast(config_dir: str, agents_yaml: str, message: str) -> None:
+    with open(os.path.join(config_dir, "agents.yaml"), "w") as f:
+        f.write(agents_yaml)
+    with pytest.raises(ConfigError, match=message):
+        ConfigLoader(config_dir)
+
+
+def test_invalid_reload_keeps_previous_config(config_dir: str) -> None:
+    loader = ConfigLoader(config_dir, check_interval=0)
+    previous = loader.config
+    path = os.path.join(config_dir, "tasks.yaml")
+    with open(path, "a") as f:
+        f.write("extra_tasks:\n  orphan:\n    description: d\n    agent: missing_agent\n")
+    _touch_later(path)
+
+    with pytest.raises(ConfigError, match="unknown agent 'missing_agent'"):
+        loader.reload_if_changed()
+    assert loader.config is previous
@@ -0,0 +1,100 @@
+"""Tests for the JSONL event log and its analytics export."""
+import glob
+import json
+import os
+
+from app.utils.event_log import EventLog, compact_event_logs
+
+
+def _read_lines(paths) -> list:
+    events = []
+    for path in paths:
+        with open(path) as f:
+            events.extend(json.loads(line) for line in f)
+    return events
+
+
+def test_events_are_written_and_rotated(tmp_path) -> None:
+    log = EventLog(str(tmp_path), max_bytes=500, flush_interval=0.01)
+    for i in range(20):
+        log.log("chat", latency_ms=i * 1.5, model="small-model", agents=["chat"])
+    log.flush()
+    log.close()
+
+    segments = sorted(glob.glob(str(tmp_path / "events-*.jsonl")))
+    assert segments, "expected at least one closed segment"
+    events = _read_lines(segments + glob.glob(log.active_path))
+    assert [e["latency_ms"] for e in events] == [i * 1.5 for i in range(20)]
+    assert all(e["kind"] == "chat" and "ts" in e for e in events)
+
+
+def test_rotate_closes_active_segment(tmp_path) -> None:
+    log = EventLog(str(tmp_path), flush_interval=0.01)
+    log.log("assistant_request", success=True)
+    path = log.rotate()
+    log.close()
+
+    assert path and os.path.basename(path).startswith("events-")
+    assert not os.path.exists(log.active_path)
+    assert _read_lines([path])[0]["kind"] == "assistant_request"
+
+
+def test_compaction_writes_parquet(tmp_path) -> None:
+    import pandas as pd
+
+    log = EventLog(str(tmp_path / "events"), flush_interval=0.01)
+    log.log("chat", latency_ms=12.5, agents=["chat"], success=True)
+    log.log("crew", latency_ms=900.0, agents=["Scheduling Assistant"], success=False)
+    log.rotate()
+    log.close()
+
+    output = compact_event_logs(str(tmp_path / "events"), str(tmp_path / "analytics"))
+    df = pd.read_parquet(output)
+    assert list(df["kind"]) == ["chat", "crew"]
+    assert df["latency_ms"].sum() == 912.5
+    assert json.loads(df["agents"][1]) == ["Scheduling Assistant"]
+    assert glob.glob(str(tmp_path / "events" / "events-*.jsonl")) == []
+
+
+def test_active_segment_is_per_process(tmp_path) -> None:
+    log = EventLog(str(tmp_path), flush_interval=0.01)
+    log.close()
+    assert os.path.basename(log.active_path) == f"events.{os.getpid()}.active.jsonl"
+
+
+def test_compaction_keeps_unreadable_segments(tmp_path) -> None:
+    log = EventLog(str(tmp_path / "events"), flush_interval=0.01)
+    log.log("chat", latency_ms=1.0)
+    log.rotate()
+    log.close()
+    corrupt = tmp_path / "events" / "events-00000000T000000-bad.jsonl"
+    corrupt.write_text('{"kind": "chat", "ts": "2024-')
+
+    assert compact_event_logs(str(tmp_path / "events"), str(tmp_path / "analytics"))
+    assert glob.glob(str(tmp_path / "events" / "events-*.jsonl")) == []
+    assert os.path.exists(str(corrupt) + ".corrupt")
+
+
+def test_closed_log_reaches_parquet(tmp_path) -> None:
+    import pandas as pd
+
+    log = EventLog(str(tmp_path / "events"), flush_interval=0.01)
+    log.log("chat", latency_ms=3.0)
+    log.close()
+
+    assert not os.path.exists(log.active_path)
+    output = compact_event_logs(str(tmp_path / "events"), str(tmp_path / "analytics"))
+    assert list(pd.read_parquet(output)["kind"]) == ["chat"]
+
+
+def test_orphaned_active_segments_are_adopted(tmp_path) -> None:
+    import subprocess
+    import sys
+
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+    orphan = tmp_path / f"events.{finished.stdout.strip()}.active.jsonl"
+    orphan.write_text(json.dumps({"ts": "2024-03-18T09:00:00+00:00", "kind": "chat"}) + "\n")
+
+    assert compact_event_logs(str(tmp_path), str(tmp_path / "analytics"))
+    assert not orphan.exists()
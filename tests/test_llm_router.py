@@ -0,0 +1,87 @@
+"""Tests for multi-model routing and failover."""
+import pytest
+
+from app.utils.llm_router import (
+    LARGE,
+    SMALL,
+    FakeBackend,
+    ModelRouter,
+    ModelSpec,
+    classify_complexity,
+)
+
+
+@pytest.fixture
+def models() -> list:
+    """Fixture providing one small and one large model."""
+    return [ModelSpec("small-model", SMALL, 0.05, 0.08), ModelSpec("large-model", LARGE, 0.59, 0.79)]
+
+
+@pytest.mark.parametrize("message,expected", [
+    ("hi there", SMALL),
+    ("thanks!", SMALL),
+    ("Can you explain how transformers work?", LARGE),
+    ("x" * 500, LARGE),
+])
+def test_classify_complexity(message: str, expected: str) -> None:
+    assert classify_complexity([{"role": "user", "content": message}]) == expected
+
+
+def test_routes_by_complexity(models: list) -> None:
+    router = ModelRouter(models, FakeBackend())
+    simple = router.complete([{"role": "user", "content": "hello"}])
+    complex_turn = router.complete([{"role": "user", "content": "please compare these two plans"}])
+    assert simple.model == "small-model"
+    assert complex_turn.model == "large-model"
+
+
+def test_fails_over_and_cools_down(models: list) -> None:
+    backend = FakeBackend(failure_rates={"small-model": 1.0})
+    router = ModelRouter(models, backend, min_samples=2, error_threshold=0.5, cooldown=60)
+    messages = [{"role": "user", "content": "hello"}]
+
+    first = router.complete(messages)
+    assert first.model == "large-model"
+    assert first.attempts == ["small-model", "large-model"]
+
+    router.complete(messages)
+    assert router.complete(messages).attempts == ["large-model"]
+    stats = router.stats()
+    assert stats["small-model"]["available"] is False
+    assert stats["small-model"]["errors"] == 2
+    assert stats["large-model"]["requests"] == 3
+    assert stats["large-model"]["cost_usd"] > 0
+
+
+def test_all_models_failing_raises(models: list) -> None:
+    backend = FakeBackend(failure_rates={"small-model": 1.0, "large-model": 1.0})
+    router = ModelRouter(models, backend)
+    with pytest.raises(RuntimeError, match="All models failed"):
+        router.complete([{"role": "user", "content": "hello"}])
+
+
+def test_stream_fails_over_before_first_chunk(models: list) -> None:
+    backend = FakeBackend(failure_rates={"small-model": 1.0}, reply=lambda model, messages: "a b")
+    router = ModelRouter(models, backend)
+    assert "".join(router.stream([{"role": "user", "content": "hey"}])) == "a b "
+
+
+def test_stream_records_reported_usage_and_chunks(models: list) -> None:
+    backend = FakeBackend(reply=lambda model, messages: "one two three")
+    router = ModelRouter(models, backend)
+    assert "".join(router.stream([{"role": "user", "content": "hey there"}], tier=SMALL))
+
+    stats = router.stats()["small-model"]
+    assert (stats["prompt_tokens"], stats["completion_tokens"]) == (2, 3)
+    assert stats["stream_chunks"] == 3
+
+
+def test_stream_estimates_tokens_without_usage(models: list) -> None:
+    class NoUsageBackend:
+        def stream(self, model, messages, **kwargs):
+            yield "abcdefgh"
+
+    router = ModelRouter(models, NoUsageBackend())
+    list(router.stream([{"role": "user", "content": "x" * 40}], tier=SMALL))
+    stats = router.stats()["small-model"]
+    assert (stats["prompt_tokens"], stats["completion_tokens"], stats["stream_chunks"]) == (10, 2, 1)
@@ -0,0 +1,85 @@
+"""Tests for the compact conversation model."""
+import json
+
+import pytest
+
+from app.models.message import Conversation, Message
+
+
+def test_message_compression_round_trip() -> None:
+    text = "The quick brown fox jumps over the lazy dog. " * 40
+    message = Message("assistant", text)
+    before = message.nbytes
+
+    assert message.compress()
+    assert message.compressed
+    assert message.content == text
+    assert message.nbytes < before
+    assert not Message("user", "short").compress()
+
+
+def test_unknown_role_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown message role"):
+        Message("robot", "beep")
+
+
+def test_old_turns_are_compressed_and_recent_turns_stay_hot() -> None:
+    conversation = Conversation(hot_messages=4, max_bytes=10 ** 9)
+    for i in range(10):
+        conversation.append("user" if i % 2 == 0 else "assistant", f"turn {i} " + "x" * 500)
+
+    assert [m.compressed for m in conversation] == [True] * 6 + [False] * 4
+    assert conversation.recent(2) == [
+        {"role": "user", "content": "turn 8 " + "x" * 500},
+        {"role": "assistant", "content": "turn 9 " + "x" * 500},
+    ]
+    assert json.loads(conversation.to_json())[0]["content"].startswith("turn 0 ")
+
+
+def test_memory_cap_evicts_oldest_turns() -> None:
+    conversation = Conversation(hot_messages=2, max_bytes=4000, compress_min_bytes=10 ** 9)
+    for i in range(20):
+        conversation.append("user", f"{i:02d}" + "y" * 500)
+
+    assert conversation.nbytes <= 4000
+    assert conversation.evicted == 20 - len(conversation)
+    assert conversation[-1].content.startswith("19")
+    assert len(conversation) >= 2
+
+
+def test_accepts_dicts_and_clears() -> None:
+    conversation = Conversation.from_dicts([{"role": "user", "content": "hi"}])
+    conversation.append({"role": "assistant", "content": "hello"})
+    assert conversation.to_dicts() == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    conversation.clear()
+    assert len(conversation) == 0 and conversation.nbytes == 0
+
+
+def test_turns_round_trip_through_the_database(tmp_path) -> None:
+    import sqlite3
+
+    from app.utils.db_utils import DatabaseUtils
+
+    db_path = str(tmp_path / "assistant.db")
+    # A database from before turns were stored has no turns column
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                     'timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, user_message TEXT, '
+                     'ai_response TEXT, metadata TEXT)')
+        conn.execute("INSERT INTO conversations (user_message, ai_response) VALUES ('old', 'reply')")
+    db = DatabaseUtils(db_path)
+
+    long_reply = "z" * 1000
+    turns = Conversation([Message("user", "hi"), Message("assistant", long_reply)])
+    assert db.save_turns(turns, {"session": 1}) > 0
+    assert db.save_conversation("again", "sure") > 0
+
+    row = db.get_conversation_history(1)[0]
+    assert json.loads(row["turns"]) == [{"role": "user", "content": "again"},
+                                        {"role": "assistant", "content": "sure"}]
+    loaded = db.get_conversation(10, hot_messages=2)
+    assert [m.content for m in loaded] == ["old", "reply", "hi", long_reply, "again", "sure"]
+    assert loaded[3].compressed
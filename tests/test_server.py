@@ -0,0 +1,130 @@
+"""Tests for the headless ASGI API."""
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.server import AssistantAPI
+
+
+class FakeChatAgent:
+    """Chat agent stub that echoes the message back in chunks."""
+
+    def stream_message(self, message: str, context: Optional[Dict[str, Any]] = None):
+        for word in message.split():
+            yield word + " "
+
+
+class FakeCrew:
+    """Crew stub recording calls; optionally blocks until released."""
+
+    def __init__(self, gate: Optional[threading.Event] = None):
+        self.gate = gate
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    def process_user_input(self, user_input: str, context: Optional[Dict[str, Any]] = None):
+        if self.gate:
+            self.gate.wait(5)
+        self.calls.append((user_input, context))
+        return {"chat": {"response": f"echo: {user_input}", "success": True}}
+
+    def get_agent(self, agent_type: str):
+        return FakeChatAgent() if agent_type == "chat" else None
+
+
+async def _request(app: AssistantAPI, method: str, path: str,
+                   body: Any = None) -> Tuple[int, Dict[bytes, bytes], bytes]:
+    """Drive one HTTP request through the ASGI app and collect the response."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    received = {"sent": False}
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        if received["sent"]:
+            await asyncio.sleep(3600)
+        received["sent"] = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app({"type": "http", "method": method, "path": path}, receive, send)
+    start = messages[0]
+    body_bytes = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body_bytes
+
+
+def test_chat_passes_message_and_history() -> None:
+    crew = FakeCrew()
+    app = AssistantAPI(crew_factory=lambda: crew)
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+    status, _, body = asyncio.run(_request(
+        app, "POST", "/api/agent/chat", {"message": "ping", "history": history}
+    ))
+
+    assert status == 200
+    assert json.loads(body)["results"]["chat"]["response"] == "echo: ping"
+    assert crew.calls == [("ping", {"history": history})]
+
+
+def test_chat_stream_returns_ndjson_chunks() -> None:
+    app = AssistantAPI(crew_factory=FakeCrew)
+
+    status, headers, body = asyncio.run(_request(
+        app, "POST", "/api/agent/chat/stream", {"message": "one two"}
+    ))
+
+    assert status == 200
+    assert headers[b"content-type"] == b"application/x-ndjson"
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines == [{"delta": "one "}, {"delta": "two "}, {"done": True}]
+
+
+def test_invalid_requests() -> None:
+    app = AssistantAPI(crew_factory=FakeCrew)
+    assert asyncio.run(_request(app, "POST", "/api/agent/chat", {"message": ""}))[0] == 400
+    assert asyncio.run(_request(app, "GET", "/api/agent/chat"))[0] == 405
+    assert asyncio.run(_request(app, "GET", "/missing"))[0] == 404
+
+
+def test_backpressure_rejects_when_queue_is_full() -> None:
+    gate = threading.Event()
+    app = AssistantAPI(crew_factory=lambda: FakeCrew(gate), max_concurrency=1, max_queue=1)
+
+    async def scenario() -> List[int]:
+        await app._ensure_crew()
+        first = asyncio.ensure_future(_request(app, "POST", "/api/agent/chat", {"message": "a"}))
+        second = asyncio.ensure_future(_request(app, "POST", "/api/agent/chat", {"message": "b"}))
+        await asyncio.sleep(0.05)
+        rejected = await _request(app, "POST", "/api/agent/chat", {"message": "c"})
+        gate.set()
+        return [rejected[0], (await first)[0], (await second)[0]]
+
+    assert asyncio.run(scenario()) == [503, 200, 200]
+
+
+def test_real_crew_serves_chat(voice_stubs, monkeypatch, tmp_path) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setenv("EVENT_LOG_ENABLED", "false")
+    from app.utils import llm_router
+    from app.utils.llm_router import FakeBackend, ModelRouter, models_from_env
+
+    monkeypatch.setattr(llm_router, "_router",
+                        ModelRouter(models_from_env(), FakeBackend(reply=lambda m, msgs: "hi there")))
+    app = AssistantAPI()
+
+    async def scenario() -> List[Tuple[int, Dict[bytes, bytes], bytes]]:
+        await app._ensure_crew()
+        chat = await _request(app, "POST", "/api/agent/chat", {"message": "hello"})
+        podcast = await _request(app, "POST", "/api/agent/chat", {"message": "plan a podcast episode"})
+        models = await _request(app, "GET", "/api/models")
+        return [chat, podcast, models]
+
+    chat, podcast, models = asyncio.run(scenario())
+    assert chat[0] == 200
+    assert json.loads(chat[2])["results"]["chat"]["response"] == "hi there"
+    assert podcast[0] == 200
+    assert json.loads(podcast[2])["results"]["chat"]["success"] is True
+    assert models[0] == 200 and json.loads(models[2])["models"]
@@ -0,0 +1,63 @@
+"""Tests for in-memory audio decoding used by voice mode."""
+import io
+import wave
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def voice_utils(voice_stubs):
+    """Import voice_utils with speech dependencies stubbed for this test only."""
+    import app.utils.voice_utils as module
+    return module
+
+
+def _wav_bytes(frames: np.ndarray, width: int, channels: int = 1, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(frames.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("width,frames,expected", [
+    (1, np.array([128, 192, 0], dtype=np.uint8), [0.0, 0.5, -1.0]),
+    (2, np.array([0, 16384, -32768], dtype="<i2"), [0.0, 0.5, -1.0]),
+    (4, np.array([0, 1 << 30, -(1 << 31)], dtype="<i4"), [0.0, 0.5, -1.0]),
+])
+def test_decode_pcm_wav_widths(voice_utils, width: int, frames: np.ndarray,
+                               expected: list) -> None:
+    samples = voice_utils.decode_audio(_wav_bytes(frames, width))
+    assert samples.dtype == np.float32
+    np.testing.assert_allclose(samples, expected)
+
+
+def test_decode_stereo_wav_is_downmixed(voice_utils) -> None:
+    frames = np.array([16384, -16384, 32767, 32767], dtype="<i2")
+    samples = voice_utils.decode_audio(io.BytesIO(_wav_bytes(frames, 2, channels=2)))
+    np.testing.assert_allclose(samples, [0.0, 32767 / 32768], rtol=1e-6)
+
+
+def test_resample_length(voice_utils) -> None:
+    samples = np.zeros(44100, dtype=np.float32)
+    assert voice_utils._resample(samples, 44100).size == voice_utils.WHISPER_SAMPLE_RATE
+    assert voice_utils._resample(samples[:8000], 8000).size == 2 * 8000
+    assert voice_utils._resample(samples, voice_utils.WHISPER_SAMPLE_RATE) is samples
+
+
+def test_numpy_integer_input_is_normalized(voice_utils) -> None:
+    samples = voice_utils.decode_audio(np.array([16000, -16000, 32000], dtype=np.int16))
+    np.testing.assert_allclose(samples, np.array([16000, -16000, 32000]) / 32768)
+    assert np.abs(samples).max() <= 1.0
+
+    unsigned = voice_utils.decode_audio(np.array([128, 255], dtype=np.uint8))
+    np.testing.assert_allclose(unsigned, [0.0, 127 / 128])
+
+
+def test_iter_chunks_yields_bytes(voice_utils) -> None:
+    chunks = list(voice_utils.iter_chunks(b"abcdefg", chunk_size=3))
+    assert chunks == [b"abc", b"def", b"g"]
+    assert all(type(chunk) is bytes for chunk in chunks)